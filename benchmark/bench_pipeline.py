@@ -0,0 +1,549 @@
+import os
+import sys
+import json
+import glob
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+from collections import defaultdict
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pandas as pd
+
+# ================= 路径配置区域 =================
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP1_DIR = os.path.join(REPO_DIR, "step1 data clean")
+STEP2_DIR = os.path.join(REPO_DIR, "step2 top-k and word embedding")
+STOPWORDS_SRC = os.path.join(STEP2_DIR, "country-orgin", "cn_stopwords.txt")
+
+sys.path.insert(0, REPO_DIR)
+from common.script_loader import load_script
+
+# 基准结果保存目录 (每次运行一个 JSON，baseline.json 作为回归对比基准)
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+# ================= 合成语料配置 =================
+DEFAULT_DOCS = 500
+DEFAULT_COUNTRIES = 4
+DEFAULT_SEED = 42
+
+# 与 TOP-K.py 的动态 TopK 分档对应: (最短字数, 最长字数, 占比)
+LENGTH_BUCKETS = {
+    'short':  (40, 99, 0.2),     # < 100 字 -> Top 3
+    'medium': (100, 299, 0.3),   # < 300 字 -> Top 5
+    'long':   (300, 1500, 0.5),  # 其余    -> Top 10
+}
+
+# 合成正文使用的词池 (包含部分 FIXED_WORDS，保证固定词表生效)
+TOPIC_WORDS = [
+    "一带一路", "碳中和", "供应链", "人工智能", "可再生能源", "气候变化",
+    "通货膨胀", "温室气体", "巴黎协定", "绿色经济", "命运共同体",
+    "能源", "贸易", "投资", "合作", "经济", "市场", "企业", "技术", "创新",
+    "基础设施", "港口", "铁路", "电动汽车", "光伏", "风电", "氢能", "芯片",
+    "半导体", "出口", "进口", "关税", "制造业", "农业", "粮食", "医疗",
+    "疫苗", "教育", "旅游", "金融", "银行", "货币", "汇率", "债务", "就业",
+    "总统", "总理", "外长", "议会", "峰会", "论坛", "协议", "谈判", "政策",
+]
+FILLER_WORDS = ["的", "和", "在", "与", "推动", "加强", "表示", "认为", "指出", "双方", "进一步", "持续"]
+PUNCTUATION = ["，", "，", "，", "。"]
+
+# 默认运行的阶段 (bert 需要下载模型，需显式指定)
+DEFAULT_STAGES = ['divide', 'topk', 'wordcloud', 'similarity']
+ALL_STAGES = DEFAULT_STAGES + ['bert']
+
+# 回归判定阈值：耗时或峰值内存超过基准 10% 记为回退
+REGRESSION_TOLERANCE = 0.10
+
+# 国家全称 -> 简称 (与 TOP-K.py 保持一致，用于生成分类关键词)
+COUNTRIES = {
+    "德国": "德", "意大利": "意", "日本": "日", "韩国": "韩", "沙特阿拉伯": "沙特",
+    "印度尼西亚": "印尼", "美国": "美", "英国": "英", "法国": "法", "中国": "中",
+}
+
+TASK_FOLDER = "bench"
+
+# ==============================================
+
+class PhaseTimer:
+    """按阶段累计耗时 (秒)，并记录因环境原因跳过的阶段"""
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.skipped = {}
+
+    def skip(self, name, reason):
+        self.skipped[name] = reason
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存 (MB)，无法获取时返回 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        if sys.platform == 'darwin':
+            return peak / 1024 / 1024
+        return peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+# ================= 合成语料 =================
+
+def synth_text(rng, country, min_len, max_len):
+    """生成一篇长度落在 [min_len, max_len] 的合成新闻正文"""
+    target_len = rng.randint(min_len, max_len)
+    short_name = COUNTRIES.get(country, country[0])
+    parts = [country]
+    length = len(country)
+    while length < target_len:
+        word = rng.choice(TOPIC_WORDS) if rng.random() < 0.6 else rng.choice(FILLER_WORDS)
+        if rng.random() < 0.05:
+            word = rng.choice([country, f"{short_name}方", f"{country}政府"])
+        parts.append(word)
+        length += len(word)
+        if rng.random() < 0.12:
+            parts.append(rng.choice(PUNCTUATION))
+            length += 1
+    return "".join(parts)[:max_len]
+
+def pick_bucket(rng, buckets):
+    roll = rng.random()
+    acc = 0.0
+    for name, (min_len, max_len, ratio) in buckets.items():
+        acc += ratio
+        if roll <= acc:
+            return name, min_len, max_len
+    name = list(buckets)[-1]
+    return name, buckets[name][0], buckets[name][1]
+
+def generate_corpus(corpus_dir, n_docs, n_countries, seed, buckets=None):
+    """
+    在 corpus_dir 下生成合成语料：
+      country/<国家>/text_*.txt       供 TOP-K 使用的国家目录
+      export/<任务>/<任务>.csv + txt  供 divide 使用的原始导出
+    返回语料统计信息
+    """
+    buckets = buckets or LENGTH_BUCKETS
+    rng = random.Random(seed)
+    countries = list(COUNTRIES)[:n_countries]
+
+    country_root = os.path.join(corpus_dir, "country")
+    export_dir = os.path.join(corpus_dir, "export", TASK_FOLDER)
+    os.makedirs(export_dir, exist_ok=True)
+    for country in countries:
+        os.makedirs(os.path.join(country_root, country), exist_ok=True)
+
+    if os.path.exists(STOPWORDS_SRC):
+        shutil.copy2(STOPWORDS_SRC, os.path.join(country_root, "cn_stopwords.txt"))
+
+    rows = []
+    bucket_counts = defaultdict(int)
+    total_chars = 0
+    for i in range(n_docs):
+        country = countries[i % len(countries)]
+        bucket, min_len, max_len = pick_bucket(rng, buckets)
+        text = synth_text(rng, country, min_len, max_len)
+        file_id = f"text_{i:07d}.txt"
+
+        with open(os.path.join(country_root, country, file_id), 'w', encoding='utf-8') as f:
+            f.write(text)
+        with open(os.path.join(export_dir, file_id), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+        rows.append({
+            'fileId': file_id,
+            'area': country,
+            'title': text[:20],
+            'keywords': ",".join(rng.sample(TOPIC_WORDS, 3)),
+            'description': text[:60],
+            'news_category': "国际",
+            'source': "合成",
+        })
+        bucket_counts[bucket] += 1
+        total_chars += len(text)
+
+    pd.DataFrame(rows).to_csv(os.path.join(export_dir, f"{TASK_FOLDER}.csv"), index=False, encoding='utf-8-sig')
+
+    return {
+        'docs': n_docs,
+        'countries': countries,
+        'buckets': dict(bucket_counts),
+        'total_chars': total_chars,
+        'seed': seed,
+    }
+
+# ================= 各阶段基准 =================
+
+def bench_divide(corpus_dir, timer):
+    """直接运行 divide.py 的 process_and_copy_files (分块读取 + 流式写出)，分类耗时单独统计"""
+    with timer.phase('setup'):
+        divide = load_script(os.path.join(STEP1_DIR, "divide.py"), "divide")
+        countries = os.listdir(os.path.join(corpus_dir, "country"))
+        divide.BASE_DIR = os.path.join(corpus_dir, "export")
+        divide.CURRENT_TASK_FOLDER = TASK_FOLDER
+        divide.TASK_CONFIG = {c: [c, COUNTRIES.get(c, c[0])] for c in countries if c in COUNTRIES}
+        divide.RESUME = False
+
+        classify_timer = PhaseTimer()
+        classify_text = divide.classify_text
+
+        def timed_classify(*args, **kwargs):
+            with classify_timer.phase('classification'):
+                return classify_text(*args, **kwargs)
+        divide.classify_text = timed_classify
+
+    start = time.perf_counter()
+    divide.process_and_copy_files()
+    elapsed = time.perf_counter() - start
+
+    # 分类以外的时间为 CSV 读取、文件复制与分批写盘
+    classification = classify_timer.phases['classification']
+    timer.phases['classification'] += classification
+    timer.phases['io'] += max(0.0, elapsed - classification)
+
+    work_dir = os.path.join(divide.BASE_DIR, TASK_FOLDER)
+    n_docs = sum(len(chunk) for chunk in divide.iter_export_csv(os.path.join(work_dir, f"{TASK_FOLDER}.csv")))
+    return n_docs, n_docs, 'docs'
+
+def bench_topk(corpus_dir, timer):
+    """
+    直接运行 TOP-K.py 的 extract_and_save_to_target (分词后端、流式写出与诊断计时均为真实流程)
+    分阶段耗时取自 TOP-K 自带的逐篇诊断：分词时间由 TimedTokenizer 从 TF-IDF / TextRank 中拆出
+    """
+    with timer.phase('setup'):
+        topk = load_script(os.path.join(STEP2_DIR, "TOP-K.py"), "topk")
+        topk.SOURCE_DIR = os.path.join(corpus_dir, "country")
+        topk.OUTPUT_DIR = os.path.join(corpus_dir, "TOP-K keyword")
+        topk.STOPWORDS_PATH = os.path.join(topk.SOURCE_DIR, "cn_stopwords.txt")
+        topk.STATS_DIR = os.path.join(topk.OUTPUT_DIR, "stats")
+        topk.ENABLE_INSTRUMENTATION = True
+        topk.RESUME = False
+        topk.jieba.setLogLevel(60)
+        # 词典加载计入 setup，不计入逐篇耗时
+        topk.jieba.initialize()
+        topk.init_jieba_environment()
+
+    start = time.perf_counter()
+    topk.extract_and_save_to_target()
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(topk.STATS_DIR, "topk_stats.json"), 'r', encoding='utf-8') as f:
+        summaries = json.load(f)
+
+    phase_map = {'decode': 'io', 'segmentation': 'segmentation', 'tfidf': 'ranking',
+                 'textrank': 'ranking', 'fusion': 'fusion'}
+    measured = 0.0
+    for summary in summaries.values():
+        for name, target in phase_map.items():
+            seconds = summary['phases'].get(name, {}).get('sum', 0.0)
+            timer.phases[target] += seconds
+            measured += seconds
+    # 逐篇计时以外的部分：停用词切换、分批写盘等
+    timer.phases['aggregation'] += max(0.0, elapsed - measured)
+
+    n_docs = sum(s['docs_ok'] + s['docs_skipped'] for s in summaries.values())
+    return n_docs, n_docs, 'docs'
+
+NO_FONT_REASON = "找不到中文字体"
+
+def resolve_cjk_font():
+    """可用的中文字体路径，没有时返回 None (各阶段跳过绘图并记录，不影响其余耗时的统计)"""
+    heatmap_render = load_script(os.path.join(STEP2_DIR, "heatmap_render.py"), "heatmap_render")
+    return heatmap_render.resolve_cjk_font()
+
+def bench_wordcloud(corpus_dir, timer):
+    with timer.phase('setup'):
+        wcloud = load_script(os.path.join(STEP2_DIR, "word cloud.py"), "word_cloud")
+        font_path = wcloud.FONT_PATH if os.path.exists(wcloud.FONT_PATH) else resolve_cjk_font()
+        if font_path:
+            wcloud.FONT_PATH = font_path
+        ellipse_mask = wcloud.create_ellipse_mask(width=1600, height=1000)
+
+    input_dir = os.path.join(corpus_dir, "TOP-K keyword")
+    output_dir = os.path.join(corpus_dir, "country-keyword")
+    os.makedirs(output_dir, exist_ok=True)
+
+    n_docs = 0
+    n_countries = 0
+    for csv_file in sorted(f for f in os.listdir(input_dir) if f.endswith('_keywords.csv')):
+        country_name = csv_file.replace('_keywords.csv', '')
+        with timer.phase('io'):
+            df = wcloud.read_keyword_csv(os.path.join(input_dir, csv_file))
+
+        with timer.phase('aggregation'):
+            word_counts = wcloud.count_document_frequency(df)
+            if not word_counts:
+                continue
+            final_items, target_n, _ = wcloud.select_keywords(word_counts)
+            weight_df = wcloud.build_weight_frame(final_items)
+
+        with timer.phase('io'):
+            weight_df.to_csv(os.path.join(output_dir, f"{country_name}_Weights.csv"), index=False, encoding='utf-8-sig')
+
+        if font_path:
+            with timer.phase('rendering'):
+                wcloud.render_wordcloud(dict(final_items), target_n, ellipse_mask,
+                                        os.path.join(output_dir, f"{country_name}_Cloud.png"))
+
+        n_docs += len(df)
+        n_countries += 1
+
+    if not font_path:
+        timer.skip('rendering', NO_FONT_REASON)
+    return n_docs, n_countries, 'countries'
+
+def bench_similarity(corpus_dir, timer):
+    with timer.phase('setup'):
+        cosine = load_script(os.path.join(STEP2_DIR, "keyword_based_cosine_weighted",
+                                          "keyword_based_cosine_weighted.py"), "keyword_based_cosine_weighted")
+        font_path = resolve_cjk_font()
+
+    weights_dir = os.path.join(corpus_dir, "country-keyword")
+    with timer.phase('io'):
+        data_dict = cosine.load_country_weights(weights_dir)
+    if not data_dict:
+        raise RuntimeError("缺少 *_Weights.csv，请先运行 wordcloud 阶段")
+
+    with timer.phase('similarity'):
+        df_sim = cosine.compute_similarity(data_dict)
+
+    if font_path:
+        with timer.phase('rendering'):
+            cosine.render_preset(df_sim, os.path.join(corpus_dir, "Task3_Weighted_Heatmap.png"),
+                                 'weighted', force=True)
+    else:
+        timer.skip('rendering', NO_FONT_REASON)
+
+    return _count_docs(corpus_dir), len(df_sim), 'countries'
+
+def bench_bert(corpus_dir, timer):
+    with timer.phase('setup'):
+        bert = load_script(os.path.join(STEP2_DIR, "bert", "Bert.py"), "bert_similarity")
+        model = bert.load_model()
+        font_path = resolve_cjk_font()
+
+    with timer.phase('io'):
+        files = glob.glob(os.path.join(corpus_dir, "country-keyword", '*_Weights.csv'))
+        country_texts = bert.load_country_texts(files)
+    if not country_texts:
+        raise RuntimeError("缺少 *_Weights.csv，请先运行 wordcloud 阶段")
+
+    with timer.phase('embedding'):
+        embeddings = bert.encode_countries(model, country_texts)
+    with timer.phase('similarity'):
+        df_sim = bert.similarity_matrix(embeddings)
+    if font_path:
+        with timer.phase('rendering'):
+            bert.render_preset(df_sim, os.path.join(corpus_dir, "Task3_BERT_Heatmap.png"), 'bert', force=True)
+    else:
+        timer.skip('rendering', NO_FONT_REASON)
+
+    return _count_docs(corpus_dir), len(df_sim), 'countries'
+
+def _count_docs(corpus_dir):
+    country_root = os.path.join(corpus_dir, "country")
+    return sum(
+        len([f for f in os.listdir(os.path.join(country_root, c)) if f.endswith('.txt')])
+        for c in os.listdir(country_root) if os.path.isdir(os.path.join(country_root, c))
+    )
+
+STAGE_FUNCS = {
+    'divide': bench_divide,
+    'topk': bench_topk,
+    'wordcloud': bench_wordcloud,
+    'similarity': bench_similarity,
+    'bert': bench_bert,
+}
+
+def run_stage(stage, corpus_dir, verbose=False):
+    """在独立进程中执行单个阶段，保证峰值内存互不干扰"""
+    timer = PhaseTimer()
+    start = time.perf_counter()
+    try:
+        if verbose:
+            docs, items, unit = STAGE_FUNCS[stage](corpus_dir, timer)
+        else:
+            with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+                docs, items, unit = STAGE_FUNCS[stage](corpus_dir, timer)
+    except ImportError as e:
+        return {'stage': stage, 'status': 'skipped', 'reason': f"缺少依赖: {e}"}
+    except Exception as e:
+        return {'stage': stage, 'status': 'failed', 'reason': f"{type(e).__name__}: {e}"}
+    seconds = time.perf_counter() - start
+
+    phases = dict(timer.phases)
+    phases['other'] = max(0.0, seconds - sum(phases.values()))
+    # 吞吐只按处理耗时计算，模块加载、词典与模型初始化 (setup) 单独报告
+    setup = phases.get('setup', 0.0)
+    run_seconds = seconds - setup
+    return {
+        'stage': stage,
+        'status': 'ok',
+        'seconds': seconds,
+        'setup_seconds': round(setup, 6),
+        'docs': docs,
+        'docs_per_sec': docs / run_seconds if run_seconds > 0 else None,
+        'items': items,
+        'unit': unit,
+        'peak_rss_mb': peak_rss_mb(),
+        'phases': {k: round(v, 6) for k, v in sorted(phases.items(), key=lambda kv: -kv[1])},
+        'skipped_phases': dict(timer.skipped),
+    }
+
+# ================= 报告与回归对比 =================
+
+def print_report(result):
+    corpus = result['corpus']
+    print("=" * 60)
+    print(f"合成语料: {corpus['docs']} 篇, {len(corpus['countries'])} 个国家, "
+          f"{corpus['total_chars']} 字, 分档 {corpus['buckets']}")
+    print("-" * 60)
+    for stage in result['stages']:
+        if stage['status'] != 'ok':
+            print(f"[{stage['stage']}] {stage['status']}: {stage['reason']}")
+            continue
+        rss = f"{stage['peak_rss_mb']:.1f} MB" if stage['peak_rss_mb'] is not None else "n/a"
+        print(f"[{stage['stage']}] {stage['seconds']:.3f}s (setup {stage.get('setup_seconds', 0.0):.3f}s) | "
+              f"{stage['docs_per_sec']:.1f} docs/s | {stage['items']} {stage['unit']} | 峰值内存 {rss}")
+        for name, sec in stage['phases'].items():
+            share = sec / stage['seconds'] * 100 if stage['seconds'] else 0
+            print(f"    - {name:<15} {sec:8.3f}s  {share:5.1f}%")
+        for name, reason in stage.get('skipped_phases', {}).items():
+            print(f"    - {name:<15} [跳过] {reason}")
+
+def compare_with_baseline(result, baseline, tolerance=REGRESSION_TOLERANCE):
+    """与基准结果逐阶段对比，返回回退的阶段列表"""
+    base_stages = {s['stage']: s for s in baseline.get('stages', []) if s.get('status') == 'ok'}
+    regressions = []
+    print("-" * 60)
+    print(f"与基准对比 (基准时间 {baseline.get('timestamp', '?')}):")
+    if baseline.get('corpus', {}).get('docs') != result['corpus']['docs']:
+        print("  [警告] 语料规模与基准不同，吞吐量对比更可靠")
+
+    for stage in result['stages']:
+        base = base_stages.get(stage['stage'])
+        if stage['status'] != 'ok' or base is None:
+            continue
+        speed_ratio = stage['docs_per_sec'] / base['docs_per_sec'] if base['docs_per_sec'] else None
+        rss_ratio = None
+        if stage['peak_rss_mb'] and base.get('peak_rss_mb'):
+            rss_ratio = stage['peak_rss_mb'] / base['peak_rss_mb']
+
+        flags = []
+        if set(stage.get('skipped_phases', {})) != set(base.get('skipped_phases', {})):
+            print(f"  [警告] [{stage['stage']}] 跳过的阶段与基准不同，吞吐量不可直接对比")
+        if speed_ratio is not None and speed_ratio < 1 - tolerance:
+            flags.append("变慢")
+        if rss_ratio is not None and rss_ratio > 1 + tolerance:
+            flags.append("内存上涨")
+        if flags:
+            regressions.append(stage['stage'])
+
+        speed_txt = f"{speed_ratio:.2f}x" if speed_ratio is not None else "n/a"
+        rss_txt = f"{rss_ratio:.2f}x" if rss_ratio is not None else "n/a"
+        mark = f"  <-- [回退] {'/'.join(flags)}" if flags else ""
+        print(f"  [{stage['stage']}] 吞吐 {speed_txt} | 内存 {rss_txt}{mark}")
+
+    return regressions
+
+def save_result(result, results_dir, save_baseline=False):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(results_dir, f"bench_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    if save_baseline:
+        baseline_path = os.path.join(results_dir, "baseline.json")
+        shutil.copy2(path, baseline_path)
+        print(f"已更新基准: {baseline_path}")
+    return path
+
+def parse_mix(mix):
+    """'0.2,0.3,0.5' -> 覆盖 LENGTH_BUCKETS 中 short/medium/long 的占比"""
+    ratios = [float(x) for x in mix.split(',')]
+    if len(ratios) != len(LENGTH_BUCKETS):
+        raise ValueError(f"--mix 需要 {len(LENGTH_BUCKETS)} 个占比")
+    total = sum(ratios)
+    return {
+        name: (min_len, max_len, ratio / total)
+        for (name, (min_len, max_len, _)), ratio in zip(LENGTH_BUCKETS.items(), ratios)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GCPS 各阶段性能基准 (合成中文新闻语料)")
+    parser.add_argument('--docs', type=int, default=DEFAULT_DOCS, help="合成文档总数")
+    parser.add_argument('--countries', type=int, default=DEFAULT_COUNTRIES, help=f"国家数 (最多 {len(COUNTRIES)})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--mix', default=None, help="short,medium,long 三档长度占比，如 0.2,0.3,0.5")
+    parser.add_argument('--stages', default=",".join(DEFAULT_STAGES), help=f"逗号分隔，可选 {','.join(ALL_STAGES)}")
+    parser.add_argument('--corpus-dir', default=None, help="语料目录 (默认临时目录，运行后删除)")
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="回归对比使用的基准 JSON")
+    parser.add_argument('--save-baseline', action='store_true', help="将本次结果设为新的基准")
+    parser.add_argument('--verbose', action='store_true', help="显示各脚本自身的输出")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGE_FUNCS]
+    if unknown:
+        parser.error(f"未知阶段: {unknown}")
+
+    buckets = parse_mix(args.mix) if args.mix else LENGTH_BUCKETS
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="gcps_bench_")
+    cleanup = args.corpus_dir is None
+
+    try:
+        print(f"正在生成合成语料: {corpus_dir}")
+        gen_start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, args.docs, min(args.countries, len(COUNTRIES)), args.seed, buckets)
+        print(f"-> 生成完成，用时 {time.perf_counter() - gen_start:.2f}s")
+
+        # 每个阶段使用全新的 spawn 子进程，峰值内存与模块缓存互不影响
+        ctx = multiprocessing.get_context('spawn')
+        stage_results = []
+        for stage in stages:
+            print(f"正在运行阶段: {stage} ...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+                stage_results.append(executor.submit(run_stage, stage, corpus_dir, args.verbose).result())
+
+        result = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'corpus': corpus,
+            'stages': stage_results,
+        }
+        print_report(result)
+
+        regressions = []
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                regressions = compare_with_baseline(result, json.load(f))
+
+        save_result(result, args.results_dir, args.save_baseline)
+        return 1 if regressions else 0
+    finally:
+        if cleanup:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
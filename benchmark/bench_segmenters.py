@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+# ================= 路径配置区域 =================
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP2_DIR = os.path.join(REPO_DIR, "step2 top-k and word embedding")
+
+sys.path.insert(0, REPO_DIR)
+from common.script_loader import load_script
+
+# 默认对比真实语料 (关键词一致率在合成语料上没有意义)
+SOURCE_DIR = os.path.join(STEP2_DIR, "country-orgin")
+
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark", "results")
+
+# ================= 对比配置 =================
+
+# 抽样文档总数 (各国平均分配，按文件名等间隔抽样)
+DEFAULT_DOCS = 300
+
+# 一致率以该后端的结果为基准
+REFERENCE_BACKEND = "jieba"
+
+# ==============================================
+
+def load_sample(topk, source_dir, n_docs):
+    """{国家: [(file_name, 清洗后正文)]}"""
+    countries = sorted(d for d in os.listdir(source_dir) if os.path.isdir(os.path.join(source_dir, d)))
+    per_country = max(n_docs // max(len(countries), 1), 1)
+    corpus = {}
+    for country in countries:
+        country_dir = os.path.join(source_dir, country)
+        file_list = [f for f in os.listdir(country_dir) if f.lower().endswith('.txt')]
+        docs = []
+        for file_name in topk.corpus_stats.sample_files(file_list, per_country):
+            content_clean = topk.read_text(os.path.join(country_dir, file_name)).replace('\n', '').strip()
+            if content_clean:
+                docs.append((file_name, content_clean))
+        if docs:
+            corpus[country] = docs
+    return corpus
+
+def _rate(n, seconds):
+    return n / seconds if seconds > 0 else 0.0
+
+def run_backend(topk, name, corpus, base_stopwords, batch_size, options):
+    """单个后端：纯分词吞吐 + 完整动态 TopK 提取吞吐，并记录每篇的切分与关键词"""
+    start = time.perf_counter()
+    try:
+        tokenizer, previous = topk.init_segmenter(name, **options)
+    except ImportError as e:
+        return {'backend': name, 'status': 'skipped', 'reason': str(e)}
+    backend = tokenizer.segmenter
+
+    texts = [text for docs in corpus.values() for _, text in docs]
+    names = [f"{country}/{file_name}" for country, docs in corpus.items() for file_name, _ in docs]
+    chars = sum(len(t) for t in texts)
+
+    try:
+        # 预热 (进程池启动、模型加载) 单独计时
+        backend.cut_batch(texts[:2])
+        startup = time.perf_counter() - start
+
+        seg_start = time.perf_counter()
+        tokens = []
+        for i in range(0, len(texts), batch_size):
+            tokens.extend([p.word for p in pairs] for pairs in backend.cut_batch(texts[i:i + batch_size]))
+        seg_seconds = time.perf_counter() - seg_start
+
+        # 完整提取 (清空缓存，分词耗时计入)
+        tokenizer.clear()
+        keywords = []
+        ext_start = time.perf_counter()
+        for country, docs in corpus.items():
+            topk.apply_country_stopwords(base_stopwords, country)
+            country_texts = [text for _, text in docs]
+            for i in range(0, len(country_texts), batch_size):
+                batch = country_texts[i:i + batch_size]
+                tokenizer.prime(batch)
+                keywords.extend(topk.extract_keywords(text) for text in batch)
+        ext_seconds = time.perf_counter() - ext_start
+    finally:
+        topk.segmenter.uninstall(previous)
+        tokenizer.close()
+
+    return {
+        'backend': name,
+        'status': 'ok',
+        'startup_seconds': round(startup, 3),
+        'segmentation': {
+            'seconds': round(seg_seconds, 3),
+            'docs_per_sec': round(_rate(len(texts), seg_seconds), 1),
+            'chars_per_sec': round(_rate(chars, seg_seconds), 1),
+            'tokens': sum(len(t) for t in tokens),
+        },
+        'extraction': {
+            'seconds': round(ext_seconds, 3),
+            'docs_per_sec': round(_rate(len(texts), ext_seconds), 1),
+        },
+        'docs': dict(zip(names, ({'tokens': t, 'keywords': k} for t, k in zip(tokens, keywords)))),
+    }
+
+def _spans(words):
+    spans, pos = set(), 0
+    for w in words:
+        spans.add((pos, pos + len(w)))
+        pos += len(w)
+    return spans
+
+def agreement(reference, other):
+    """
+    与基准后端逐篇对比
+    - segmentation_f1: 切分边界 (词的起止位置) 的 F1
+    - keyword_jaccard: 最终关键词集合的 Jaccard 均值；keyword_exact: 关键词完全相同的文档占比；top1: 首个关键词相同的占比
+    """
+    seg_f1, jaccard, exact, top1 = [], [], 0, 0
+    for name, ref in reference['docs'].items():
+        doc = other['docs'][name]
+        a, b = _spans(ref['tokens']), _spans(doc['tokens'])
+        seg_f1.append(2 * len(a & b) / (len(a) + len(b)) if a or b else 1.0)
+
+        ka, kb = set(ref['keywords']), set(doc['keywords'])
+        jaccard.append(len(ka & kb) / len(ka | kb) if ka | kb else 1.0)
+        exact += ref['keywords'] == doc['keywords']
+        top1 += ref['keywords'][:1] == doc['keywords'][:1]
+
+    n = max(len(reference['docs']), 1)
+    return {
+        'segmentation_f1': round(sum(seg_f1) / n, 4),
+        'keyword_jaccard': round(sum(jaccard) / n, 4),
+        'keyword_exact': round(exact / n, 4),
+        'top1': round(top1 / n, 4),
+    }
+
+def print_report(result):
+    print("=" * 72)
+    print(f"语料: {result['corpus']['docs']} 篇, {result['corpus']['chars']} 字 | 基准后端: {result['reference']}")
+    print("-" * 72)
+    print(f"{'后端':<16}{'启动(s)':>8}{'分词 docs/s':>13}{'提取 docs/s':>13}{'切分F1':>9}{'关键词J':>9}{'完全一致':>9}")
+    for r in result['backends']:
+        if r['status'] != 'ok':
+            print(f"{r['backend']:<16}[跳过] {r['reason']}")
+            continue
+        agree = r.get('agreement') or {}
+        print(f"{r['backend']:<16}{r['startup_seconds']:>8.2f}{r['segmentation']['docs_per_sec']:>13.1f}"
+              f"{r['extraction']['docs_per_sec']:>13.1f}{agree.get('segmentation_f1', float('nan')):>9.3f}"
+              f"{agree.get('keyword_jaccard', float('nan')):>9.3f}{agree.get('keyword_exact', float('nan')):>9.3f}")
+
+def main(argv=None):
+    topk = load_script(os.path.join(STEP2_DIR, "TOP-K.py"), "topk")
+    backends_all = topk.segmenter.BACKENDS
+
+    parser = argparse.ArgumentParser(description="分词后端对比：吞吐量与关键词一致率")
+    parser.add_argument('--source', default=SOURCE_DIR, help="国家文档库 (含 cn_stopwords.txt)")
+    parser.add_argument('--docs', type=int, default=DEFAULT_DOCS, help="抽样文档总数")
+    parser.add_argument('--backends', default=",".join(backends_all), help=f"逗号分隔，可选 {','.join(backends_all)}")
+    parser.add_argument('--batch-size', type=int, default=topk.SEGMENT_BATCH_SIZE)
+    parser.add_argument('--processes', type=int, default=None, help="jieba-parallel 的进程数")
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    unknown = [b for b in backends if b not in backends_all]
+    if unknown:
+        parser.error(f"未知后端: {unknown}")
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    topk.STOPWORDS_PATH = os.path.join(args.source, "cn_stopwords.txt")
+    topk.jieba.setLogLevel(60)
+    topk.jieba.initialize()
+    topk.init_jieba_environment()
+    base_stopwords = topk.get_base_stopwords()
+
+    corpus = load_sample(topk, args.source, args.docs)
+    n_docs = sum(len(docs) for docs in corpus.values())
+    if not n_docs:
+        print(f"没有可用的文档: {args.source}")
+        return 1
+    print(f"抽样 {n_docs} 篇 ({len(corpus)} 个国家)")
+
+    runs = []
+    for name in backends:
+        print(f"正在运行后端: {name} ...")
+        options = {'processes': args.processes} if name == "jieba-parallel" and args.processes else {}
+        runs.append(run_backend(topk, name, corpus, base_stopwords, args.batch_size, options))
+
+    reference = next(r for r in runs if r['backend'] == REFERENCE_BACKEND)
+    for r in runs:
+        if r['status'] == 'ok':
+            r['agreement'] = agreement(reference, r)
+
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'cpu_count': os.cpu_count(),
+        'reference': REFERENCE_BACKEND,
+        'corpus': {
+            'source': args.source,
+            'docs': n_docs,
+            'chars': sum(len(text) for docs in corpus.values() for _, text in docs),
+            'countries': {c: len(docs) for c, docs in corpus.items()},
+        },
+        # 逐篇切分与关键词只用于计算一致率，不写入报告
+        'backends': [{k: v for k, v in r.items() if k != 'docs'} for r in runs],
+    }
+    print_report(result)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"bench_segmenters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+import os
+import sys
+import importlib.util
+
+def load_script(path, name):
+    """
+    按文件路径加载脚本模块 (脚本名含空格或连字符，无法直接 import)
+    脚本所在目录加入 sys.path，使其能导入同目录下的模块
+    """
+    module_dir = os.path.dirname(path)
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
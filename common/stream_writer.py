@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import glob
+
+import pandas as pd
+
+# ================= 默认配置 =================
+
+# 缓冲区达到任一上限即写盘：行数 / 估算内存 (MB)
+DEFAULT_BATCH_ROWS = 500
+DEFAULT_MAX_BUFFER_MB = 64
+
+# 断点文件后缀 (与输出文件同目录；正常结束后自动删除)
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+DONE_SUFFIX = ".done.txt"
+
+# 多个输出组成一次运行时的运行清单后缀 (整次运行结束后自动删除)
+RUN_MANIFEST_SUFFIX = ".run" + CHECKPOINT_SUFFIX
+
+# ===========================================
+
+def _row_size(row):
+    """估算一行在内存中的大小 (字节)，只用于触发写盘，不要求精确"""
+    return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+
+class StreamWriter:
+    """
+    分批写出结果，内存占用与目录大小无关
+    - 缓冲区超过 batch_rows 行或 max_buffer_mb 时写盘：CSV 追加写入，Parquet 每批写一个 part 文件
+    - 每次写盘后记录断点 (已写入的 key 与文件大小)；中断后再次运行会截掉未记录的尾部并跳过已完成的 key，
+      中断时尚在缓冲区中的结果 (至多一批) 会重新计算
+    - close() 写出剩余数据并删除断点文件
+    """
+    def __init__(self, path, columns, key=None, batch_rows=DEFAULT_BATCH_ROWS,
+                 max_buffer_mb=DEFAULT_MAX_BUFFER_MB, resume=True):
+        self.path = path
+        self.columns = list(columns)
+        self.key = key
+        self.batch_rows = batch_rows
+        self.max_buffer_bytes = max_buffer_mb * 1024 * 1024 if max_buffer_mb else None
+        self.fmt = 'parquet' if path.lower().endswith('.parquet') else 'csv'
+
+        self.checkpoint_path = path + CHECKPOINT_SUFFIX
+        self.done_path = path + DONE_SUFFIX
+
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.pending_keys = []
+        self.done = set()
+        self.rows_written = 0
+        self.parts = 0
+
+        if resume and os.path.exists(self.checkpoint_path):
+            self._restore()
+        else:
+            self._reset()
+
+    # ---------- 断点 ----------
+    def _reset(self):
+        """从头开始：清除上次的输出与断点"""
+        if self.fmt == 'parquet':
+            for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+                os.remove(part)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        for path in (self.checkpoint_path, self.done_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _restore(self):
+        """按断点恢复：丢弃最后一次记录之后写入的数据，读回已完成的 key"""
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+
+        self.rows_written = checkpoint['rows_written']
+        self.parts = checkpoint.get('parts', 0)
+        if self.fmt == 'parquet':
+            for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+                if int(os.path.basename(part)[5:10]) >= self.parts:
+                    os.remove(part)
+        elif os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(checkpoint['data_bytes'])
+
+        if os.path.exists(self.done_path):
+            with open(self.done_path, 'r+b') as f:
+                f.truncate(checkpoint['done_bytes'])
+            with open(self.done_path, 'r', encoding='utf-8') as f:
+                self.done = set(line.rstrip('\n') for line in f if line.strip())
+
+        print(f"  -> [断点续跑] {os.path.basename(self.path)}: 已完成 {self.rows_written} 行，"
+              f"跳过 {len(self.done)} 个已处理项")
+
+    def _save_checkpoint(self):
+        data_bytes = os.path.getsize(self.path) if self.fmt == 'csv' and os.path.exists(self.path) else 0
+        done_bytes = os.path.getsize(self.done_path) if os.path.exists(self.done_path) else 0
+        checkpoint = {
+            'rows_written': self.rows_written,
+            'parts': self.parts,
+            'data_bytes': data_bytes,
+            'done_bytes': done_bytes,
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ---------- 写入 ----------
+    def is_done(self, key):
+        return key in self.done
+
+    def mark_done(self, key):
+        """记录没有产出行的 key (如空文档)，续跑时同样跳过"""
+        if self.key is not None:
+            self.pending_keys.append(str(key))
+
+    def write(self, row):
+        self.buffer.append(row)
+        self.buffer_bytes += _row_size(row)
+        if self.key is not None:
+            self.pending_keys.append(str(row[self.key]))
+
+        if len(self.buffer) >= self.batch_rows or (
+                self.max_buffer_bytes and self.buffer_bytes >= self.max_buffer_bytes):
+            self.flush()
+
+    def flush(self):
+        if not self.buffer and not self.pending_keys:
+            return
+        if self.buffer:
+            self._write_batch(pd.DataFrame(self.buffer, columns=self.columns))
+            self.rows_written += len(self.buffer)
+
+        if self.pending_keys:
+            with open(self.done_path, 'a', encoding='utf-8') as f:
+                f.write("".join(k + "\n" for k in self.pending_keys))
+            self.done.update(self.pending_keys)
+
+        self._save_checkpoint()
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.pending_keys = []
+
+    def _write_batch(self, df):
+        if self.fmt == 'parquet':
+            os.makedirs(self.path, exist_ok=True)
+            df.to_parquet(os.path.join(self.path, f"part-{self.parts:05d}.parquet"), index=False)
+            self.parts += 1
+            return
+
+        save_dir = os.path.dirname(self.path)
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+        # 已有文件追加时不能再写 BOM
+        file_exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        with open(self.path, 'a', encoding='utf-8' if file_exists else 'utf-8-sig', newline='') as f:
+            df.to_csv(f, header=not file_exists, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        """写出剩余数据，正常结束后删除断点文件"""
+        self.flush()
+        for path in (self.checkpoint_path, self.done_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return self.rows_written
+
+class RunManifest:
+    """
+    一次运行包含多个输出 (如 TOP-K.py 的各国家) 时，记录本次运行中已经写完的输出
+    StreamWriter.close() 会删除单个输出的断点，没有这份清单时，中断后续跑会把已完成的输出当作新任务重置；
+    续跑时 is_complete() 为 True 的输出直接跳过，整次运行结束后 finish() 删除清单，下次运行从头开始
+    """
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.completed = {}
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.completed = json.load(f).get('completed', {})
+            if self.completed:
+                print(f"  -> [断点续跑] 上次运行已完成 {len(self.completed)} 项: {', '.join(self.completed)}")
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def is_complete(self, key):
+        return key in self.completed
+
+    def mark_complete(self, key, rows=0):
+        self.completed[key] = rows
+        save_dir = os.path.dirname(self.path)
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'completed': self.completed}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def finish(self):
+        """整次运行正常结束：删除清单"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.completed = {}
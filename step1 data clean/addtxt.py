@@ -1,6 +1,10 @@
 import pandas as pd
 import os
 
+def make_file_id(orgin_file_id):
+    """text_ + orgin_fileId + .txt"""
+    return 'text_' + str(orgin_file_id) + '.txt'
+
 def process_csv(file_path):
     # 检查文件是否存在
     if not os.path.exists(file_path):
@@ -30,7 +34,7 @@ def process_csv(file_path):
 
         # 3. 生成新的 fileId 内容
         # 逻辑：text_ + orgin_fileId + .txt
-        new_file_id_values = 'text_' + df['orgin_fileId'].astype(str) + '.txt'
+        new_file_id_values = df['orgin_fileId'].astype(str).map(make_file_id)
 
         # 4. 在第一列插入新的 'fileId' 列
         # insert(插入位置索引, 列名, 列内容)
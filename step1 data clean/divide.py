@@ -1,7 +1,13 @@
 import pandas as pd
 import os
+import sys
+import codecs
 import shutil
 
+# 分批写出工具为 step1 / step2 共用模块 (仓库根目录下的 common)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.stream_writer import StreamWriter
+
 # ================= 核心配置区域 =================
 
 # 1. 基础路径
@@ -13,26 +19,100 @@ CURRENT_TASK_FOLDER = "日韩沙特印尼"
 
 # 3. 国家关键词规则配置
 # 逻辑：脚本会统计关键词出现的频率，将文件归类到频率最高的国家
-TASK_CONFIG = {
-    # === 德意 组配置 (如需使用请取消注释并修改 CURRENT_TASK_FOLDER) ===
-    # "德国": ["德国", "德意志", "柏林", "法兰克福", "Germany", "Deutsch", "默克尔", "朔尔茨", "中德", "德媒"],
-    # "意大利": ["意大利", "意国", "罗马", "米兰", "Italy", "Italian", "意大", "中意", "意媒"],
-    
-    # === 日韩沙特印尼 组配置 ===
+# 键名与国家文档库 (country-orgin) 中的文件夹名一致；ingest.py 共用这张表
+COUNTRY_CONFIG = {
+    "中国": ["中国", "北京", "China", "Chinese", "中方", "国务院"],
+    "德国": ["德国", "德意志", "柏林", "法兰克福", "Germany", "Deutsch", "默克尔", "朔尔茨", "中德", "德媒"],
+    "意大利": ["意大利", "意国", "罗马", "米兰", "Italy", "Italian", "意大", "中意", "意媒"],
     "日本": ["日本", "东京", "大阪", "Japan", "Jp", "日媒", "中日", "安倍", "岸田"],
     "韩国": ["韩国", "首尔", "Korea", "KR", "韩媒", "中韩", "文在寅", "尹锡悦"],
-    "沙特": ["沙特", "利雅得", "Saudi", "Riyadh", "沙特阿拉伯", "本·萨勒曼"],
-    "印尼": ["印尼", "印度尼西亚", "雅加达", "Indonesia", "佐科"],
+    "沙特阿拉伯": ["沙特", "利雅得", "Saudi", "Riyadh", "沙特阿拉伯", "本·萨勒曼"],
+    "印度尼西亚": ["印尼", "印度尼西亚", "雅加达", "Indonesia", "佐科"],
+    "美国": ["美国", "华盛顿", "白宫", "USA", "America", "美媒", "中美", "拜登", "特朗普"],
+    "英国": ["英国", "伦敦", "Britain", "UK", "英媒", "中英", "约翰逊", "苏纳克"],
+    "法国": ["法国", "巴黎", "France", "French", "法媒", "中法", "马克龙"],
 }
 
+# 各任务文件夹只在其包含的国家之间分类 (切换任务组时修改 CURRENT_TASK_FOLDER)
+TASK_COUNTRIES = {
+    "德意": ["德国", "意大利"],
+    "日韩沙特印尼": ["日本", "韩国", "沙特阿拉伯", "印度尼西亚"],
+}
+TASK_CONFIG = {country: COUNTRY_CONFIG[country] for country in TASK_COUNTRIES[CURRENT_TASK_FOLDER]}
+
 # 4. 未分类文件夹的名称
 UNCLASSIFIED_NAME = "未分类"
 
 # 5. 需要用于搜索关键词的列 (按优先级排序，合并在一起进行统计)
 SEARCH_COLUMNS = ['area', 'title', 'keywords', 'description', 'news_category', 'source']
 
+# 6. 大文件分批处理：每次读取的 CSV 行数 / 分类结果缓冲达到行数或估算内存上限 (MB) 即写盘
+CHUNK_ROWS = 5000
+STREAM_BATCH_ROWS = 1000
+STREAM_MAX_BUFFER_MB = 64
+
+# 7. 中断后再次运行时，从断点继续 (跳过已写入的 fileId)；False 则每次从头开始
+RESUME = True
+
 # ==============================================
 
+def detect_encoding(path, block_size=1 << 20):
+    """逐块试解码判断 CSV 编码 (utf-8 失败时使用 GB18030)，避免分块读取到一半才报错"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    decoder.decode(b'', final=True)
+                    break
+                decoder.decode(block)
+    except UnicodeDecodeError:
+        return 'gb18030'
+    return 'utf-8-sig'
+
+def iter_export_csv(csv_path, chunksize=CHUNK_ROWS):
+    """分块读取导出的 CSV，所有列按字符串读取 (分块推断类型会导致各块不一致)"""
+    encoding = detect_encoding(csv_path)
+    if encoding != 'utf-8-sig':
+        print("UTF-8读取失败，切换为 GB18030 读取...")
+    return pd.read_csv(csv_path, encoding=encoding, chunksize=chunksize, dtype=str)
+
+def build_content_text(row):
+    """将所有搜索列合并为一个长字符串，并转小写"""
+    return " ".join([str(row.get(col, '')) for col in SEARCH_COLUMNS]).lower()
+
+def classify_text(content_text, task_config=None):
+    """按关键词出现频次确定国家分类，全部为 0 时归入未分类"""
+    if task_config is None:
+        task_config = TASK_CONFIG
+
+    # 计算每个国家的得分
+    scores = {}
+    for country, keywords in task_config.items():
+        count = 0
+        for kw in keywords:
+            # 统计关键词出现的次数 (例如 'Korea' 出现了 3 次)
+            # 注意：kw也要转小写以匹配 content_text
+            count += content_text.count(kw.lower())
+        scores[country] = count
+
+    # 找出最高分
+    # max_score 是最高的分数
+    # best_country 是最高分对应的国家名
+    if not scores:
+        best_country = UNCLASSIFIED_NAME
+        max_score = 0
+    else:
+        # key=scores.get 表示按照字典的值来比较
+        best_country = max(scores, key=scores.get)
+        max_score = scores[best_country]
+
+    # 判定最终归属
+    if max_score > 0:
+        return best_country
+    return UNCLASSIFIED_NAME
+
 def process_and_copy_files():
     # 构造工作路径
     work_dir = os.path.join(BASE_DIR, CURRENT_TASK_FOLDER)
@@ -43,17 +123,12 @@ def process_and_copy_files():
         print(f"[错误] 找不到CSV文件: {csv_path}")
         return
 
-    # 1. 读取 CSV
+    # 1. 分块读取 CSV
     print(f"正在读取 CSV: {csv_path} ...")
-    try:
-        df = pd.read_csv(csv_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        print("UTF-8读取失败，切换为 GB18030 读取...")
-        df = pd.read_csv(csv_path, encoding='gb18030')
+    chunks = iter_export_csv(csv_path)
 
-    # 2. 初始化数据容器和目录
+    # 2. 初始化目录 (各分类的 CSV 写入器在首次用到时创建)
     all_categories = list(TASK_CONFIG.keys()) + [UNCLASSIFIED_NAME]
-    data_buckets = {cat: [] for cat in all_categories}
 
     # 创建目标文件夹
     print("正在创建目标文件夹...")
@@ -67,76 +142,58 @@ def process_and_copy_files():
     print("开始基于关键词频次进行分类...")
     
     stats = {'success_copy': 0, 'missing_file': 0}
-
-    for index, row in df.iterrows():
-        file_id = str(row.get('fileId', '')).strip()
-        
-        # 如果没有 fileId，跳过
-        if not file_id or file_id.lower() == 'nan':
-            continue
-
-        # --- 步骤 A: 确定分类 (核心修改部分) ---
-        
-        # 1. 准备文本：将所有搜索列合并为一个长字符串，并转小写
-        content_text = " ".join([str(row.get(col, '')) for col in SEARCH_COLUMNS]).lower()
-        
-        # 2. 计算每个国家的得分
-        scores = {}
-        for country, keywords in TASK_CONFIG.items():
-            count = 0
-            for kw in keywords:
-                # 统计关键词出现的次数 (例如 'Korea' 出现了 3 次)
-                # 注意：kw也要转小写以匹配 content_text
-                count += content_text.count(kw.lower())
-            scores[country] = count
-        
-        # 3. 找出最高分
-        # max_score 是最高的分数
-        # best_country 是最高分对应的国家名
-        if not scores:
-            best_country = UNCLASSIFIED_NAME
-            max_score = 0
-        else:
-            # key=scores.get 表示按照字典的值来比较
-            best_country = max(scores, key=scores.get)
-            max_score = scores[best_country]
-
-        # 4. 判定最终归属
-        if max_score > 0:
-            target_category = best_country
-        else:
-            target_category = UNCLASSIFIED_NAME
-        
-        # 将行数据加入对应列表
-        data_buckets[target_category].append(row)
-
-        # --- 步骤 B: 复制文件 ---
-        src_file_path = os.path.join(work_dir, file_id)
-        dst_dir_path = os.path.join(work_dir, target_category)
-        dst_file_path = os.path.join(dst_dir_path, file_id)
-
-        if os.path.exists(src_file_path):
-            try:
-                shutil.copy2(src_file_path, dst_file_path)
-                stats['success_copy'] += 1
-            except Exception as e:
-                print(f"[复制失败] {file_id}: {e}")
-        else:
-            stats['missing_file'] += 1
-
-    # 4. 生成各分类的 CSV 文件
+    writers = {}
+
+    for chunk in chunks:
+        if not writers:
+            # 分类结果逐批写入 <分类>/<分类>.csv，内存中只保留一批
+            writers = {
+                cat: StreamWriter(os.path.join(work_dir, cat, f"{cat}.csv"), chunk.columns, key='fileId',
+                                  batch_rows=STREAM_BATCH_ROWS, max_buffer_mb=STREAM_MAX_BUFFER_MB, resume=RESUME)
+                for cat in all_categories
+            }
+
+        for row in chunk.to_dict('records'):
+            file_id = str(row.get('fileId', '')).strip()
+            
+            # 如果没有 fileId，跳过
+            if not file_id or file_id.lower() == 'nan':
+                continue
+
+            # 断点续跑：已写入的行跳过
+            if any(w.is_done(file_id) for w in writers.values()):
+                continue
+
+            # --- 步骤 A: 确定分类 (核心修改部分) ---
+            content_text = build_content_text(row)
+            target_category = classify_text(content_text)
+
+            # --- 步骤 B: 复制文件 ---
+            src_file_path = os.path.join(work_dir, file_id)
+            dst_dir_path = os.path.join(work_dir, target_category)
+            dst_file_path = os.path.join(dst_dir_path, file_id)
+
+            if os.path.exists(src_file_path):
+                try:
+                    shutil.copy2(src_file_path, dst_file_path)
+                    stats['success_copy'] += 1
+                except Exception as e:
+                    print(f"[复制失败] {file_id}: {e}")
+            else:
+                stats['missing_file'] += 1
+
+            # 复制完成后再记录该行，中断续跑时不会漏掉文件
+            writers[target_category].write(row)
+
+    # 4. 写出各分类剩余的数据
     print("-" * 30)
     print("正在生成分类 CSV 文件...")
 
-    for category, rows in data_buckets.items():
-        if len(rows) == 0:
-            continue
-            
-        sub_df = pd.DataFrame(rows)
-        save_path = os.path.join(work_dir, category, f"{category}.csv")
-        
-        sub_df.to_csv(save_path, index=False, encoding='utf-8-sig')
-        print(f"  [{category}] 类: {len(sub_df)} 条数据 (已保存)")
+    counts = {}
+    for category, writer in writers.items():
+        counts[category] = writer.close()
+        if counts[category]:
+            print(f"  [{category}] 类: {counts[category]} 条数据 (已保存)")
 
     # 5. 总结
     print("=" * 30)
@@ -145,8 +202,8 @@ def process_and_copy_files():
     print(f"源文件缺失数  : {stats['missing_file']}")
     print("-" * 15)
     print("分类详情:")
-    for cat, rows in data_buckets.items():
-        print(f"  - {cat}: {len(rows)}")
+    for cat, count in counts.items():
+        print(f"  - {cat}: {count}")
 
 if __name__ == "__main__":
     process_and_copy_files()
\ No newline at end of file
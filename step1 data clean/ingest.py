@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import asyncio
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from addtxt import make_file_id
+from divide import COUNTRY_CONFIG, TASK_COUNTRIES, build_content_text, classify_text, detect_encoding, UNCLASSIFIED_NAME
+
+# ================= 核心配置区域 =================
+
+# 1. 投递目录：新导出的 CSV 与对应的 text_*.txt 放在这里 (可有子文件夹)
+DROP_DIR = r"GCPS/step1 data clean/drop"
+
+# 2. 国家文档库：按国家分文件夹存放，TOP-K.py 直接读取
+STORE_DIR = r"GCPS/step2 top-k and word embedding/country-orgin"
+
+# 3. 未能分类的文档存放在投递目录下的 "未分类" 文件夹，不进入国家文档库
+
+# 4. 清单文件 (JSON Lines，每篇文档一行)，已入库、未分类或源文件缺失的 fileId 不会重复处理 (--force 重新处理)
+MANIFEST_NAME = "ingest_manifest.jsonl"
+DONE_STATUSES = ('stored', 'unclassified', 'missing')
+
+# 5. 国家关键词规则沿用 divide.py 的 COUNTRY_CONFIG (键名与国家文档库中的文件夹名一致)
+#    投递目录下的一级子文件夹表示导出来源，只在该来源的国家之间分类：
+#    与 divide.py 的 TASK_COUNTRIES 同名 (如 "日韩沙特印尼") 时取该组国家，
+#    以国家名开头 (如 "美国"、"中国汇总") 时只归入该国家，其余位置的 CSV 按全部国家分类
+
+# 6. 并发读写文本的线程数 / 每批读取的 CSV 行数
+DEFAULT_WORKERS = 16
+CHUNK_ROWS = 2000
+
+# ==============================================
+
+def read_text_bytes(path):
+    """读取文本并统一转换为 str (utf-8 失败时回退 gb18030)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('gb18030', errors='replace')
+
+def normalize_file_ids(chunk):
+    """
+    与 addtxt.py 相同的 fileId 改写：原 fileId -> orgin_fileId，新 fileId = text_<原id>.txt
+    已经处理过的 CSV (含 orgin_fileId 列) 保持不变
+    """
+    if 'orgin_fileId' in chunk.columns:
+        return chunk
+    if 'fileId' not in chunk.columns:
+        raise KeyError("CSV 中缺少 fileId 列")
+    chunk = chunk.rename(columns={'fileId': 'orgin_fileId'})
+    chunk.insert(0, 'fileId', chunk['orgin_fileId'].astype(str).map(make_file_id))
+    return chunk
+
+def load_manifest(manifest_path):
+    """读取已处理完毕的 fileId (状态见 DONE_STATUSES，处理失败的下次重试)"""
+    done = set()
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('status') in DONE_STATUSES:
+                done.add(record['fileId'])
+    return done
+
+def export_config(csv_path, drop_dir):
+    """按 CSV 所在的一级子文件夹确定参与分类的国家 (见配置 5)"""
+    rel_dir = os.path.dirname(os.path.relpath(csv_path, drop_dir))
+    if not rel_dir:
+        return COUNTRY_CONFIG
+    folder = rel_dir.split(os.sep)[0]
+    if folder in TASK_COUNTRIES:
+        return {country: COUNTRY_CONFIG[country] for country in TASK_COUNTRIES[folder]}
+    for country, keywords in COUNTRY_CONFIG.items():
+        if folder.startswith(country):
+            return {country: keywords}
+    return COUNTRY_CONFIG
+
+def index_text_files(drop_dir):
+    """扫描投递目录中的所有 txt：{文件名: 路径}"""
+    index = {}
+    unclassified_dir = os.path.join(drop_dir, UNCLASSIFIED_NAME)
+    for root, dirs, files in os.walk(drop_dir):
+        # 未分类输出目录不参与扫描
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != unclassified_dir]
+        for name in files:
+            if name.lower().endswith('.txt'):
+                index.setdefault(name, os.path.join(root, name))
+    return index
+
+def _store_document(src_path, dst_path):
+    """读取原文，统一为 utf-8 写入目标位置 (在线程池中执行)"""
+    text = read_text_bytes(src_path)
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    tmp_path = dst_path + ".part"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, dst_path)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest(), len(text)
+
+class Ingestor:
+    def __init__(self, drop_dir, store_dir, workers=DEFAULT_WORKERS, chunk_rows=CHUNK_ROWS,
+                 force=False, dry_run=False):
+        self.drop_dir = drop_dir
+        self.store_dir = store_dir
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.force = force
+        self.dry_run = dry_run
+
+        self.manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+        self.done = set() if force else load_manifest(self.manifest_path)
+        self.stats = {'stored': 0, 'unclassified': 0, 'missing': 0, 'skipped': 0, 'failed': 0}
+        self.per_country = {}
+
+    def _target_path(self, category, file_id):
+        if category == UNCLASSIFIED_NAME:
+            return os.path.join(self.drop_dir, UNCLASSIFIED_NAME, file_id)
+        return os.path.join(self.store_dir, category, file_id)
+
+    async def _process_row(self, semaphore, csv_path, country_config, row, text_index):
+        file_id = str(row.get('fileId', '')).strip()
+        if not file_id or file_id.lower() == 'nan':
+            return None
+        if file_id in self.done:
+            self.stats['skipped'] += 1
+            return None
+
+        category = classify_text(build_content_text(row), country_config)
+        record = {
+            'fileId': file_id,
+            'orgin_fileId': str(row.get('orgin_fileId', '')),
+            'country': category,
+            'title': str(row.get('title', ''))[:100],
+            'source_csv': os.path.relpath(csv_path, self.drop_dir),
+            'ingested_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+        src_path = text_index.get(file_id)
+        if src_path is None:
+            record['status'] = 'missing'
+            self.stats['missing'] += 1
+            self.done.add(file_id)
+            return record
+
+        dst_path = self._target_path(category, file_id)
+        record['path'] = dst_path
+        if self.dry_run:
+            record['status'] = 'dry_run'
+            self.per_country[category] = self.per_country.get(category, 0) + 1
+            return record
+
+        async with semaphore:
+            try:
+                sha1, length = await asyncio.to_thread(_store_document, src_path, dst_path)
+            except Exception as e:
+                record['status'] = 'failed'
+                record['error'] = f"{type(e).__name__}: {e}"
+                self.stats['failed'] += 1
+                return record
+
+        record.update({'sha1': sha1, 'text_length': length})
+        if category == UNCLASSIFIED_NAME:
+            record['status'] = 'unclassified'
+            self.stats['unclassified'] += 1
+        else:
+            record['status'] = 'stored'
+            self.stats['stored'] += 1
+            self.per_country[category] = self.per_country.get(category, 0) + 1
+        self.done.add(file_id)
+        return record
+
+    async def ingest_csv(self, csv_path, text_index, manifest):
+        """按块流式读取 CSV：每块内的文本读写并发执行，处理完即写入清单"""
+        encoding = detect_encoding(csv_path)
+        country_config = export_config(csv_path, self.drop_dir)
+        semaphore = asyncio.Semaphore(self.workers)
+        rows = 0
+        for chunk in pd.read_csv(csv_path, encoding=encoding, chunksize=self.chunk_rows, dtype=str):
+            chunk = normalize_file_ids(chunk)
+            tasks = [self._process_row(semaphore, csv_path, country_config, row, text_index)
+                     for row in chunk.to_dict('records')]
+            for record in await asyncio.gather(*tasks):
+                if record is not None and manifest is not None:
+                    manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if manifest is not None:
+                manifest.flush()
+            rows += len(chunk)
+        return rows
+
+    async def run(self):
+        csv_files = []
+        for root, dirs, files in os.walk(self.drop_dir):
+            dirs[:] = [d for d in dirs if d != UNCLASSIFIED_NAME]
+            csv_files.extend(os.path.join(root, f) for f in files
+                             if f.lower().endswith('.csv') and not f.endswith('_processed.csv'))
+        csv_files.sort()
+        if not csv_files:
+            print(f"投递目录中没有 CSV: {self.drop_dir}")
+            return self.stats
+
+        print(f"正在索引文本文件: {self.drop_dir} ...")
+        text_index = await asyncio.to_thread(index_text_files, self.drop_dir)
+        print(f"-> 共 {len(text_index)} 个 txt，{len(csv_files)} 个 CSV")
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        manifest = None if self.dry_run else open(self.manifest_path, 'a', encoding='utf-8')
+        try:
+            for csv_path in csv_files:
+                start = time.perf_counter()
+                try:
+                    rows = await self.ingest_csv(csv_path, text_index, manifest)
+                except Exception as e:
+                    print(f"  [失败] {csv_path}: {type(e).__name__}: {e}")
+                    continue
+                print(f"  -> {os.path.relpath(csv_path, self.drop_dir)}: {rows} 行，用时 {time.perf_counter() - start:.2f}s")
+        finally:
+            if manifest is not None:
+                manifest.close()
+        return self.stats
+
+def print_summary(ingestor):
+    stats = ingestor.stats
+    print("=" * 30)
+    print("入库报告:")
+    print(f"成功入库    : {stats['stored']}")
+    print(f"未分类      : {stats['unclassified']} (存放于 {os.path.join(ingestor.drop_dir, UNCLASSIFIED_NAME)})")
+    print(f"源文件缺失  : {stats['missing']}")
+    print(f"已入库跳过  : {stats['skipped']}")
+    print(f"失败        : {stats['failed']}")
+    print("-" * 15)
+    for country, count in sorted(ingestor.per_country.items(), key=lambda kv: -kv[1]):
+        print(f"  - {country}: {count}")
+    if ingestor.per_country:
+        print(f"\n可运行 incremental_update.py {' '.join(ingestor.per_country)} 增量更新关键词与相似度")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将投递目录中的导出 CSV 与文本一次性改写 fileId、分类并写入国家文档库")
+    parser.add_argument('--drop-dir', default=DROP_DIR)
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="并发读写文本的线程数")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="每批读取的 CSV 行数")
+    parser.add_argument('--force', action='store_true', help="忽略清单，重新处理所有文档 (含未分类与源文件缺失的文档)")
+    parser.add_argument('--dry-run', action='store_true', help="只分类统计，不写文件")
+    args = parser.parse_args()
+
+    ingestor = Ingestor(args.drop_dir, args.store_dir, workers=args.workers, chunk_rows=args.chunk_rows,
+                        force=args.force, dry_run=args.dry_run)
+    asyncio.run(ingestor.run())
+    print_summary(ingestor)
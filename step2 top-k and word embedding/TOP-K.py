@@ -1,7 +1,14 @@
 import os
-import pandas as pd
+import sys
 import jieba
 import jieba.analyse
+from jieba.analyse.tfidf import KeywordExtractor
+from topk_instrument import TopKInstrument, run_with_profile
+import textrank_sparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.stream_writer import StreamWriter, RunManifest
+import corpus_stats
+import segmenter
 
 # ================= 路径配置区域 =================
 SOURCE_DIR = r"country"
@@ -21,6 +28,19 @@ FIXED_WORDS = [
     "贸易战","贸易制裁","贸易保护主义","绿水青山就是金山银山","绿水青山"
 ]
 
+# 固定词的词性。None 时沿用 jieba 的规则 (词典里没有的固定词标为 'x'，不在 ALLOWED_POS 中，
+# 只保证不被切开)；设为 "nz" 等则固定词也可作为关键词。所有分词后端使用同一词性
+FIXED_WORD_TAG = None
+
+# 分词后端 (见 segmenter.py)
+# "jieba"         : 单进程 jieba (默认)
+# "jieba-parallel": 多进程 jieba，按文档并行切分
+# "lac"           : 百度 LAC 批量分词 (需 pip install lac)
+SEGMENTER = "jieba"
+
+# 批量后端每次预先切分的文档数
+SEGMENT_BATCH_SIZE = 64
+
 # 国家全称 -> 简称映射表
 COUNTRY_SHORT_MAP = {
     "德国": "德",
@@ -35,6 +55,39 @@ COUNTRY_SHORT_MAP = {
     "中国": "中"
 }
 
+# TextRank 实现
+# "jieba" : 原 jieba.analyse.textrank (纯 Python 图，固定 10 轮迭代，默认)
+# "sparse": textrank_sparse.py，scipy 稀疏共现矩阵 + 向量化 PageRank (需显式开启)
+#           其默认 METHOD = "power" 迭代至收敛，排序与 jieba 不同：在 295 篇文档上 Top20 候选词完全一致的
+#           只有 21 篇，融合后约 12% 文档的最终关键词发生变化；textrank_sparse.METHOD = "jieba" 时与 jieba 逐篇一致
+TEXTRANK_BACKEND = "jieba"
+
+# 按国家语料统计拟合动态 TopK (见 corpus_stats.py)，拟合参数缓存在 corpus_stats.json；
+# False 时使用下方 dynamic_top_k 的固定规则 (<100 字 3 个，<300 字 5 个，其余 10 个)
+ADAPTIVE_TOP_K = False
+
+# ================= 输出配置 =================
+# "csv" 或 "parquet" (parquet 输出为 <国家>_keywords.parquet 目录，需安装 pyarrow；下游脚本读取的是 csv)
+OUTPUT_FORMAT = "csv"
+
+# 结果分批写盘：缓冲达到行数或估算内存上限 (MB) 即追加写入，内存占用不随国家文件夹大小增长
+STREAM_BATCH_ROWS = 500
+STREAM_MAX_BUFFER_MB = 64
+
+# 中断后再次运行时，从断点继续 (跳过本次运行中已完成的国家与已写入的文档)；False 则每次从头开始
+RESUME = True
+# 运行清单 (保存在 OUTPUT_DIR 下，整次运行结束后自动删除)
+RUN_MANIFEST_NAME = "TOP-K.run.checkpoint.json"
+
+# ================= 性能诊断配置 (默认关闭) =================
+# 记录每篇文档 decode / segmentation / tfidf / textrank / fusion 耗时与失败原因，
+# 并按国家汇总到 STATS_DIR/topk_stats.json
+ENABLE_INSTRUMENTATION = False
+STATS_DIR = os.path.join(OUTPUT_DIR, "stats")
+
+# 填写路径 (如 os.path.join(STATS_DIR, "topk.prof")) 即在 cProfile 下运行整个提取过程
+PROFILE_PATH = None
+
 # ==============================================
 
 def get_base_stopwords():
@@ -55,12 +108,157 @@ def init_jieba_environment():
     加载固定词表，确保这些词不会被切分
     """
     print("正在初始化 Jieba 词典...")
-    count = 0
-    for word in FIXED_WORDS:
-        # add_word 强制让 jieba 记住这个词是一个整体
-        jieba.add_word(word)
-        count += 1
-    print(f"-> 已加载 {count} 个固定词汇 (如: {FIXED_WORDS[0]}...)")
+    # add_word 强制让 jieba 记住这个词是一个整体 (重复调用不会重复加载)
+    count = segmenter.load_user_words(FIXED_WORDS, FIXED_WORD_TAG)
+    if count:
+        print(f"-> 已加载 {count} 个固定词汇 (如: {FIXED_WORDS[0]}...)")
+
+def init_segmenter(name=None, **options):
+    """
+    创建分词后端并接入 jieba 的 TF-IDF / TextRank，返回 (CachedTokenizer, 原分词器)
+    需在 instrument.install() 之前调用，诊断计时才能包住新的分词器
+    """
+    backend = segmenter.create_segmenter(name or SEGMENTER, FIXED_WORDS, FIXED_WORD_TAG, **options)
+    tokenizer = segmenter.CachedTokenizer(backend, cache_size=SEGMENT_BATCH_SIZE)
+    previous = segmenter.install(tokenizer)
+    print(f"-> 分词后端: {backend.name}")
+    return tokenizer, previous
+
+def prefetch_segmentation(tokenizer, country_dir, file_names):
+    """批量后端：预先读取并切分一批文档，之后 TF-IDF / TextRank 直接使用缓存结果"""
+    if not tokenizer.batched:
+        return
+    texts = []
+    for file_name in file_names:
+        try:
+            texts.append(read_text(os.path.join(country_dir, file_name)).replace('\n', '').strip())
+        except Exception:
+            # 读取失败的文档在逐篇处理时记录
+            continue
+    tokenizer.prime(texts)
+
+def build_dynamic_stopwords(entry):
+    """根据国家名生成动态停用词 (全称、简称及常见搭配)"""
+    short_name = COUNTRY_SHORT_MAP.get(entry, entry[0])
+    return {
+        f"{entry}政府",
+        f"{entry}官员",
+        f"{entry}企业",
+        short_name,
+        f"{short_name}方",
+        f"{short_name}媒",
+        f"{short_name}国",
+        f"{short_name}政府",
+    }
+
+def apply_country_stopwords(base_stopwords, entry):
+    """
+    直接设置当前国家的停用词集合 (jieba 默认停用词 + 基础停用词 + 该国动态停用词)
+    jieba.analyse.set_stop_words 只会累加，按顺序处理各国时前面国家的动态停用词会带到后面的国家，
+    续跑跳过已完成的国家后结果也会不同，因此每个国家整体替换
+    """
+    stop_words = KeywordExtractor.STOP_WORDS | base_stopwords | build_dynamic_stopwords(entry)
+    jieba.analyse.default_tfidf.stop_words = stop_words
+    jieba.analyse.default_textrank.stop_words = set(stop_words)
+
+def read_text(file_path):
+    """读取单篇文本 (utf-8 失败时回退 gb18030)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f: return f.read()
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='gb18030') as f: return f.read()
+
+def dynamic_top_k(text_len, params=None):
+    """动态 TopK：按正文长度决定提取的关键词个数 (params 为该国拟合参数时按拟合结果计算)"""
+    if params: return corpus_stats.top_k_for_length(params, text_len)
+    if text_len < 100: return 3
+    elif text_len < 300: return 5
+    else: return 10
+
+def tfidf_candidates(content_clean, candidate_k):
+    """算法A: TF-IDF"""
+    return jieba.analyse.extract_tags(
+        content_clean, topK=candidate_k, withWeight=False, allowPOS=ALLOWED_POS
+    )
+
+def tfidf_weights(content_clean):
+    """全部 TF-IDF 候选词的权重 (降序)，用于拟合动态 TopK"""
+    return [w for _, w in jieba.analyse.extract_tags(
+        content_clean, topK=None, withWeight=True, allowPOS=ALLOWED_POS
+    )]
+
+def textrank_candidates(content_clean, candidate_k):
+    """算法B: TextRank"""
+    if TEXTRANK_BACKEND == "sparse":
+        return textrank_sparse.textrank(
+            content_clean, topK=candidate_k, withWeight=False, allowPOS=ALLOWED_POS
+        )
+    return jieba.analyse.textrank(
+        content_clean, topK=candidate_k, withWeight=False, allowPOS=ALLOWED_POS
+    )
+
+def rank_candidates(content_clean, candidate_k):
+    """分别用 TF-IDF 与 TextRank 提取候选词"""
+    return tfidf_candidates(content_clean, candidate_k), textrank_candidates(content_clean, candidate_k)
+
+def fuse_keywords(kw_tfidf, kw_textrank, target_top_k):
+    """双算法融合：交集优先，其次 TextRank 独有词，最后 TF-IDF 独有词"""
+    # 1. 取交集 (Intersection)
+    intersection = [w for w in kw_textrank if w in kw_tfidf]
+    
+    # 2. 补充词
+    only_textrank = [w for w in kw_textrank if w not in intersection]
+    only_tfidf = [w for w in kw_tfidf if w not in intersection]
+    
+    # 3. 合并
+    combined_keywords = intersection + only_textrank + only_tfidf
+    
+    # 4. 截取
+    return combined_keywords[:target_top_k]
+
+def fit_top_k_params(country, country_dir, file_list, stats=None, refit=False, tokenizer=None):
+    """
+    读取 (或拟合并缓存) 该国的动态 TopK 参数
+    需在应用该国停用词之后调用；抽样文档少于 corpus_stats.MIN_FIT_DOCS 篇时返回 None
+    """
+    stats = stats or corpus_stats.CorpusStats()
+    signature = corpus_stats.directory_signature(country_dir, file_list)
+    params = None if refit else stats.get('topk', country, signature)
+    if params is not None:
+        return params
+
+    texts = []
+    for file_name in corpus_stats.sample_files(file_list):
+        try:
+            content_clean = read_text(os.path.join(country_dir, file_name)).replace('\n', '').strip()
+        except Exception:
+            continue
+        if content_clean:
+            texts.append(content_clean)
+
+    weight_rows, lengths = [], []
+    for start in range(0, len(texts), SEGMENT_BATCH_SIZE):
+        batch = texts[start:start + SEGMENT_BATCH_SIZE]
+        if tokenizer is not None:
+            tokenizer.prime(batch)
+        for content_clean in batch:
+            weight_rows.append(tfidf_weights(content_clean))
+            lengths.append(len(content_clean))
+
+    params = corpus_stats.fit_topk(weight_rows, lengths)
+    if params is None:
+        return None
+    print(f"  -> [统计] 拟合动态 TopK: K = {params['a']:.2f} + {params['b']:.2f}·ln(长度)，"
+          f"样本 {params['docs']} 篇，K 中位数 {params['median_k']:g}")
+    return stats.put('topk', country, params, signature)
+
+def extract_keywords(content_clean, top_k_params=None):
+    """对清洗后的正文执行完整的动态 TopK 双算法提取"""
+    target_top_k = dynamic_top_k(len(content_clean), top_k_params)
+
+    # 提取两倍候选词
+    kw_tfidf, kw_textrank = rank_candidates(content_clean, target_top_k * 2)
+    return fuse_keywords(kw_tfidf, kw_textrank, target_top_k)
 
 
 def extract_and_save_to_target():
@@ -69,110 +267,112 @@ def extract_and_save_to_target():
 
     # 1. 初始化环境 (加载固定词表)
     init_jieba_environment()
+    tokenizer, previous_tokenizers = init_segmenter()
+
+    instrument = TopKInstrument(enabled=ENABLE_INSTRUMENTATION, stats_dir=STATS_DIR)
+    instrument.install()
+
+    # jieba 的分词器是进程级全局状态，中途出错 (或中断) 也要还原，不影响同一进程中的其他调用方
+    try:
+        extract_countries(tokenizer, instrument)
+    finally:
+        instrument.uninstall()
+        segmenter.uninstall(previous_tokenizers)
+        tokenizer.close()
+    instrument.write()
 
+def extract_countries(tokenizer, instrument):
+    """逐个国家提取关键词并分批写盘 (分词器与诊断计时由调用方安装)"""
     # 2. 读取基础停用词
     base_stopwords = get_base_stopwords()
-    temp_stopwords_file = os.path.join(OUTPUT_DIR, "temp_dynamic_stopwords.txt")
+
+    # 各国家输出写完即记录，中断续跑时已完成的国家不再重置
+    run_manifest = RunManifest(os.path.join(OUTPUT_DIR, RUN_MANIFEST_NAME), resume=RESUME)
 
     for entry in os.listdir(SOURCE_DIR):
         country_dir = os.path.join(SOURCE_DIR, entry)
         if not os.path.isdir(country_dir):
             continue
+        if run_manifest.is_complete(entry):
+            print(f"\n[跳过] {entry}: 上次运行中已完成")
+            continue
 
         print(f"\n正在处理国家: {entry} ...")
         
         short_name = COUNTRY_SHORT_MAP.get(entry, entry[0])
-        
-        # 动态停用词
-        current_dynamic_stops = {
-            f"{entry}政府",
-            f"{entry}官员",
-            f"{entry}企业",
-            short_name,
-            f"{short_name}方",
-            f"{short_name}媒",
-            f"{short_name}国",
-            f"{short_name}政府",
-        }
-        
-        combined_stopwords = base_stopwords.union(current_dynamic_stops)
 
-        try:
-            with open(temp_stopwords_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(combined_stopwords))
-            jieba.analyse.set_stop_words(temp_stopwords_file)
-            print(f"  -> 已应用动态停用词 (含简称 '{short_name}' 系列)")
-        except Exception as e:
-            print(f"  [警告] 动态停用词应用失败: {e}")
+        # 动态停用词 (只含当前国家，与处理顺序及是否续跑无关)
+        apply_country_stopwords(base_stopwords, entry)
+        print(f"  -> 已应用动态停用词 (含简称 '{short_name}' 系列)")
 
         # -------------------- 提取逻辑 --------------------
-        results = []
         file_list = [f for f in os.listdir(country_dir) if f.lower().endswith('.txt')]
 
         if not file_list:
             continue
 
-        for file_name in file_list:
+        top_k_params = fit_top_k_params(entry, country_dir, file_list, tokenizer=tokenizer) if ADAPTIVE_TOP_K else None
+
+        save_path = os.path.join(OUTPUT_DIR, f"{entry}_keywords.{OUTPUT_FORMAT}")
+        writer = StreamWriter(save_path, ['file_name', 'keywords', 'count', 'text_length'], key='file_name',
+                              batch_rows=STREAM_BATCH_ROWS, max_buffer_mb=STREAM_MAX_BUFFER_MB, resume=RESUME)
+
+        instrument.start_country(entry)
+        failed = 0
+
+        pending = [f for f in file_list if not writer.is_done(f)]
+        for i, file_name in enumerate(pending):
+            if i % SEGMENT_BATCH_SIZE == 0:
+                prefetch_segmentation(tokenizer, country_dir, pending[i:i + SEGMENT_BATCH_SIZE])
             file_path = os.path.join(country_dir, file_name)
-            try:
-                content = ""
+            with instrument.document(file_name) as doc:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f: content = f.read()
-                except UnicodeDecodeError:
-                    with open(file_path, 'r', encoding='gb18030') as f: content = f.read()
-                
-                content_clean = content.replace('\n', '').strip()
-                text_len = len(content_clean)
-                if not content_clean: continue
-
-                # 动态 TopK
-                if text_len < 100: target_top_k = 3
-                elif text_len < 300: target_top_k = 5
-                else: target_top_k = 10
-
-                # 1. 提取两倍候选词
-                candidate_k = target_top_k * 2
-
-                # 2. 算法A: TF-IDF
-                kw_tfidf = jieba.analyse.extract_tags(
-                    content_clean, topK=candidate_k, withWeight=False, allowPOS=ALLOWED_POS
-                )
-                
-                # 3. 算法B: TextRank
-                kw_textrank = jieba.analyse.textrank(
-                    content_clean, topK=candidate_k, withWeight=False, allowPOS=ALLOWED_POS
-                )
-
-                # 4. 取交集 (Intersection)
-                intersection = [w for w in kw_textrank if w in kw_tfidf]
-                
-                # 5. 补充词
-                only_textrank = [w for w in kw_textrank if w not in intersection]
-                only_tfidf = [w for w in kw_tfidf if w not in intersection]
-                
-                # 6. 合并
-                combined_keywords = intersection + only_textrank + only_tfidf
-                
-                # 7. 截取
-                final_keywords = combined_keywords[:target_top_k]
-
-                results.append({
-                    'file_name': file_name,
-                    'keywords': ",".join(final_keywords),
-                    'count': len(final_keywords),
-                    'text_length': text_len
-                })
-            except Exception:
-                pass
-
-        if results:
-            df = pd.DataFrame(results)
-            save_path = os.path.join(OUTPUT_DIR, f"{entry}_keywords.csv")
-            df.to_csv(save_path, index=False, encoding='utf-8-sig')
+                    with doc.phase('decode'):
+                        content = read_text(file_path)
+                    
+                    content_clean = content.replace('\n', '').strip()
+                    text_len = len(content_clean)
+                    doc.text_length = text_len
+                    if not content_clean:
+                        doc.skip('empty')
+                        writer.mark_done(file_name)
+                        continue
+
+                    # 动态 TopK，提取两倍候选词
+                    target_top_k = dynamic_top_k(text_len, top_k_params)
+                    candidate_k = target_top_k * 2
+
+                    with doc.phase('tfidf'):
+                        kw_tfidf = tfidf_candidates(content_clean, candidate_k)
+                    with doc.phase('textrank'):
+                        kw_textrank = textrank_candidates(content_clean, candidate_k)
+                    with doc.phase('fusion'):
+                        final_keywords = fuse_keywords(kw_tfidf, kw_textrank, target_top_k)
+
+                    writer.write({
+                        'file_name': file_name,
+                        'keywords': ",".join(final_keywords),
+                        'count': len(final_keywords),
+                        'text_length': text_len
+                    })
+                except Exception as e:
+                    doc.fail(e)
+                    failed += 1
+                    print(f"  [失败] {file_name}: {type(e).__name__}: {e}")
+
+        if failed:
+            print(f"  [警告] {entry} 共 {failed} 篇提取失败")
+        instrument.finish_country()
+
+        rows = writer.close()
+        run_manifest.mark_complete(entry, rows)
+        if rows:
             print(f"  -> [完成] 已保存至: {save_path}")
 
-    if os.path.exists(temp_stopwords_file):
-        os.remove(temp_stopwords_file)
+    run_manifest.finish()
 
 if __name__ == "__main__":
-    extract_and_save_to_target()
\ No newline at end of file
+    if PROFILE_PATH:
+        run_with_profile(extract_and_save_to_target, PROFILE_PATH)
+    else:
+        extract_and_save_to_target()
\ No newline at end of file
@@ -0,0 +1,158 @@
+import os
+import json
+
+import numpy as np
+
+# ================= 路径配置区域 =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 各国拟合参数缓存 (TOP-K.py 与 word cloud.py 共用)
+STATS_PATH = os.path.join(BASE_DIR, "corpus_stats.json")
+
+# ================= 动态 TopK 拟合配置 =================
+
+# 单篇文档的 K：取 TF-IDF 候选词权重累计达到全部候选权重 TOPK_COVERAGE 的最少词数
+# (0.3 时拟合结果与原先 3 / 5 / 10 的规则量级相当)
+TOPK_COVERAGE = 0.3
+
+# 每个国家抽样拟合的文档数 / 少于 MIN_FIT_DOCS 篇时不拟合，沿用固定规则
+TOPK_SAMPLE_DOCS = 200
+MIN_FIT_DOCS = 20
+
+# K 的上下限
+K_MIN = 3
+K_MAX = 15
+
+# ================= Zipf 截断拟合配置 =================
+
+# 国家关键词数：按拟合的 Zipf 曲线，覆盖重复出现 (DF >= 2) 关键词总频次的 WEIGHT_COVERAGE
+# 只出现在 1 篇文档中的词不代表国家 (见 DF 阈值说明)，不计入覆盖率
+WEIGHT_COVERAGE = 0.8
+
+# 截断位置的 DF 作为优先录取阈值，但不低于该值
+MIN_PRIORITY_DF = 2
+
+# ==============================================
+
+def directory_signature(dir_path, file_names):
+    """文档目录的指纹：文件数与目录修改时间 (新增/删除文件后失效)"""
+    return {'files': len(file_names), 'mtime': round(os.path.getmtime(dir_path), 3)}
+
+def file_signature(file_path):
+    """单个文件的指纹：大小与修改时间"""
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime': round(stat.st_mtime, 3)}
+
+class CorpusStats:
+    """
+    各国拟合参数的缓存
+    {'topk': {国家: {...}}, 'zipf': {国家: {...}}}，每项带 signature，数据变化后需重新拟合
+    """
+    def __init__(self, path=None):
+        self.path = path or STATS_PATH
+        self.data = {'topk': {}, 'zipf': {}}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data.update(json.load(f))
+
+    def get(self, kind, country, signature=None):
+        """取缓存参数；给出 signature 且与缓存不一致时返回 None"""
+        params = self.data[kind].get(country)
+        if params is None:
+            return None
+        if signature is not None and params.get('signature') != signature:
+            return None
+        return params
+
+    def put(self, kind, country, params, signature=None):
+        params = dict(params)
+        if signature is not None:
+            params['signature'] = signature
+        self.data[kind][country] = params
+        self.save()
+        return params
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+# ================= 动态 TopK =================
+
+def coverage_counts(weight_rows, coverage):
+    """
+    每行权重 (降序) 达到 coverage 所需的最少个数
+    各行补零成矩阵后一次 cumsum 完成，不逐篇循环
+    """
+    width = max((len(w) for w in weight_rows), default=0)
+    matrix = np.zeros((len(weight_rows), max(width, 1)))
+    for i, w in enumerate(weight_rows):
+        matrix[i, :len(w)] = w
+    totals = matrix.sum(axis=1, keepdims=True)
+    shares = np.divide(np.cumsum(matrix, axis=1), totals, out=np.ones_like(matrix), where=totals > 0)
+    return (shares < coverage).sum(axis=1) + 1
+
+def sample_files(file_names, n=TOPK_SAMPLE_DOCS):
+    """按文件名排序后等间隔抽样，结果可复现"""
+    file_names = sorted(file_names)
+    if len(file_names) <= n:
+        return file_names
+    idx = np.linspace(0, len(file_names) - 1, n).round().astype(int)
+    return [file_names[i] for i in idx]
+
+def fit_topk(weight_rows, text_lengths, coverage=TOPK_COVERAGE):
+    """
+    拟合 K = a + b · ln(正文长度)
+    weight_rows: 每篇文档全部 TF-IDF 候选词的权重 (降序)
+    """
+    lengths = np.asarray(text_lengths, dtype=float)
+    keep = lengths > 0
+    if keep.sum() < MIN_FIT_DOCS:
+        return None
+
+    k = coverage_counts([w for w, ok in zip(weight_rows, keep) if ok], coverage)
+    b, a = np.polyfit(np.log(lengths[keep]), k, 1)
+    return {
+        'a': round(float(a), 4),
+        'b': round(float(b), 4),
+        'k_min': K_MIN,
+        'k_max': K_MAX,
+        'coverage': coverage,
+        'docs': int(keep.sum()),
+        'median_k': float(np.median(k)),
+    }
+
+def top_k_for_length(params, text_len):
+    """按拟合参数计算单篇文档的 K"""
+    k = params['a'] + params['b'] * np.log(max(text_len, 1))
+    return int(np.clip(round(k), params['k_min'], params['k_max']))
+
+# ================= Zipf 截断 =================
+
+def fit_zipf(doc_freqs, coverage=WEIGHT_COVERAGE):
+    """
+    对重复出现的关键词拟合 rank-frequency 曲线 ln f = c - s · ln r，
+    取拟合曲线累计频次达到 coverage 的排名作为国家关键词数
+    返回 {'exponent', 'target_n', 'priority_min_df', ...}
+    """
+    freq = np.sort(np.asarray(list(doc_freqs), dtype=float))[::-1]
+    repeated = freq[freq >= 2]
+    if len(repeated) < 2:
+        return None
+
+    ranks = np.arange(1, len(repeated) + 1)
+    slope, intercept = np.polyfit(np.log(ranks), np.log(repeated), 1)
+    fitted = np.exp(intercept) * ranks ** slope
+    target_n = int(np.searchsorted(np.cumsum(fitted) / fitted.sum(), coverage) + 1)
+    target_n = min(target_n, len(repeated))
+
+    return {
+        'exponent': round(float(-slope), 4),
+        'target_n': target_n,
+        'priority_min_df': int(max(MIN_PRIORITY_DF, repeated[target_n - 1])),
+        'coverage': coverage,
+        'vocab': int(len(freq)),
+        'repeated': int(len(repeated)),
+        'empirical_coverage': round(float(repeated[:target_n].sum() / repeated.sum()), 4),
+    }
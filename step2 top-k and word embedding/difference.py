@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import shutil
+from heatmap_render import render_preset, difference_bound
 
 # ================= 1. 文件路径配置 =================
 # 请替换为你实际生成的两个 Excel 文件路径
@@ -43,32 +43,15 @@ df_diff.to_excel('Task3_Difference_Matrix.xlsx')
 print("差异矩阵已保存为: Task3_Difference_Matrix.xlsx")
 
 # ================= 4. 绘制“差值”热力图 =================
-plt.figure(figsize=(12, 10))
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 解决中文显示
-plt.rcParams['axes.unicode_minus'] = False    # 解决负号显示
-
-# 设定颜色映射
-# cmap='RdBu_r': Red-Blue-Reversed。
 # 红色 = 正值 (High)，蓝色 = 负值 (Low)，白色 = 0
-# center=0: 强制让白色对应 0 值，确保红蓝分界准确
-# vmin/vmax: 设定范围，建议设为对称，比如 -0.3 到 0.3，这样颜色更鲜艳
-max_val = max(abs(df_diff.min().min()), abs(df_diff.max().max()))
-bound = max_val * 1.0 # 稍微留点余地，或者直接手动指定如 0.4
-
-sns.heatmap(df_diff, 
-            annot=True,       # 显示数值
-            fmt='.2f',        # 保留两位小数
-            cmap='RdBu_r',    # 红蓝配色 (红正蓝负)
-            center=0,         # 关键参数：以0为中心
-            vmin=-bound,      # 最小值 (蓝色极值)
-            vmax=bound,       # 最大值 (红色极值)
-            square=True,      # 强制正方形格子
-            linewidths=0.5)   # 格子间距
-
-plt.title('语义增益热力图 (BERT相似度 - 关键词相似度)\n红色=语义关联更强 | 蓝色=字面重合更多', fontsize=15)
-plt.tight_layout()
+# vmin/vmax 设为对称范围，确保红蓝分界准确
+bound = difference_bound(df_diff)
 
 output_img = 'Task3_Difference_Heatmap.png'
-plt.savefig(output_img, dpi=300)
-print(f"图表已保存为: {output_img}")
-plt.savefig(r"C:\Users\Andy\Desktop\文本分析\GCPS\step2 top-k and word embedding\Task3_Difference_Heatmap.png", dpi=300)
\ No newline at end of file
+render_preset(df_diff, output_img, 'difference', vmin=-bound, vmax=bound)
+
+# 同步一份到项目目录 (直接复制，不再重复渲染)
+project_img = r"C:\Users\Andy\Desktop\文本分析\GCPS\step2 top-k and word embedding\Task3_Difference_Heatmap.png"
+if os.path.abspath(project_img) != os.path.abspath(output_img) and os.path.isdir(os.path.dirname(project_img)):
+    shutil.copy2(output_img, project_img)
+    print(f"图表已同步至: {project_img}")
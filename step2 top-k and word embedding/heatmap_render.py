@@ -0,0 +1,263 @@
+import os
+import glob
+import json
+import hashlib
+import importlib.util
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 无界面后端，服务器/子进程中也能直接出图
+import matplotlib.pyplot as plt
+from matplotlib import font_manager
+import seaborn as sns
+
+# ================= 配置区域 =================
+
+# 本地字体目录 (仓库不附带字体，放入任意 .ttf/.otf/.ttc 中文字体即可)
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+# 环境变量可直接指定字体文件，优先级最高
+FONT_ENV = "GCPS_CJK_FONT"
+
+# 附带字体不存在时，依次尝试的系统字体
+SYSTEM_FONT_CANDIDATES = [
+    r"C:\Windows\Fonts\simhei.ttf",
+    r"C:\Windows\Fonts\msyh.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+]
+
+# 可选依赖 mplfonts (pip install mplfonts) 附带的 Noto Sans CJK SC (SIL OFL 1.1)
+PACKAGE_FONT = ("mplfonts", os.path.join("fonts", "NotoSansCJKsc-Regular.otf"))
+
+# 以上路径都不存在时，按字体族名在 matplotlib 已登记的系统字体中查找
+CJK_FAMILY_CANDIDATES = [
+    "Noto Sans CJK SC", "Noto Sans SC", "Source Han Sans SC", "Source Han Sans CN",
+    "WenQuanYi Micro Hei", "WenQuanYi Zen Hei", "SimHei", "Microsoft YaHei", "PingFang SC",
+]
+
+MISSING_FONT_HELP = (
+    "未找到中文字体，热力图中的中文标签会显示为方框。任选其一即可：\n"
+    "  1. pip install mplfonts (附带 Noto Sans CJK SC)\n"
+    "  2. 安装系统字体：Debian/Ubuntu 执行 apt install fonts-noto-cjk，CentOS/Fedora 执行 dnf install google-noto-sans-cjk-ttc-fonts\n"
+    f"  3. 将 .ttf/.otf/.ttc 中文字体放入 {FONT_DIR}，或用环境变量 {FONT_ENV} 指定字体文件"
+)
+
+# 缓存文件后缀：与图片同目录，记录上次绘图时的矩阵哈希
+HASH_SUFFIX = ".hash"
+
+# 默认绘图参数
+DEFAULT_OPTIONS = {
+    'annot': True,
+    'fmt': '.2f',
+    'cmap': 'RdYlBu_r',
+    'vmin': None,
+    'vmax': None,
+    'center': None,
+    'square': False,
+    'linewidths': 0,
+    'figsize': (12, 10),
+    'dpi': 100,
+    'title_fontsize': None,
+}
+
+# 各相似度热力图的样式预设 (供各脚本与批量重绘共用)
+HEATMAP_PRESETS = {
+    'bert': {
+        'title': "国家政策语义相似度（BERT + Top-K 关键词）",
+        'vmin': 0, 'vmax': 1,
+    },
+    'weighted': {
+        'title': '国家政策加权相似度 (基于Keyword Weight)',
+        'vmin': 0, 'vmax': 1, 'title_fontsize': 16,
+    },
+    'difference': {
+        'title': '语义增益热力图 (BERT相似度 - 关键词相似度)\n红色=语义关联更强 | 蓝色=字面重合更多',
+        'cmap': 'RdBu_r', 'center': 0, 'square': True, 'linewidths': 0.5,
+        'dpi': 300, 'title_fontsize': 15,
+    },
+    'community': {
+        'title': '各国关键词社区权重分布 (行=国家，列=社区)',
+        'cmap': 'YlGnBu', 'vmin': 0, 'figsize': (18, 8), 'title_fontsize': 15,
+    },
+}
+
+# 批量重绘时使用的矩阵文件与输出图片 (相对本文件所在目录)
+BATCH_JOBS = [
+    ('bert', os.path.join("bert", "Task2_BERT_Similarity.xlsx"),
+     os.path.join("bert", "Task3_BERT_Heatmap.png")),
+    ('weighted', os.path.join("keyword_based_cosine_weighted", "Task2_Weighted_Cosine_Similarity.xlsx"),
+     os.path.join("keyword_based_cosine_weighted", "Task3_Weighted_Heatmap.png")),
+    ('difference', "Task3_Difference_Matrix.xlsx", "Task3_Difference_Heatmap.png"),
+]
+
+# ===========================================
+
+@lru_cache(maxsize=1)
+def resolve_cjk_font():
+    """
+    查找可用的中文字体 (每个进程只解析一次)
+    返回字体文件路径，找不到时返回 None
+    """
+    candidates = []
+    env_font = os.environ.get(FONT_ENV)
+    if env_font:
+        candidates.append(env_font)
+    if os.path.isdir(FONT_DIR):
+        for pattern in ('*.ttf', '*.otf', '*.ttc'):
+            candidates.extend(sorted(glob.glob(os.path.join(FONT_DIR, pattern))))
+    candidates.extend(SYSTEM_FONT_CANDIDATES)
+
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return _package_font() or _installed_family_font()
+
+def _package_font():
+    # 只定位包目录，不导入 (mplfonts 导入时还依赖 fontmeta 等包)
+    package, rel_path = PACKAGE_FONT
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    path = os.path.join(list(spec.submodule_search_locations)[0], rel_path)
+    return path if os.path.exists(path) else None
+
+def _installed_family_font():
+    installed = {font.name: font.fname for font in font_manager.fontManager.ttflist}
+    for family in CJK_FAMILY_CANDIDATES:
+        if family in installed:
+            return installed[family]
+    return None
+
+@lru_cache(maxsize=1)
+def setup_cjk_font():
+    """注册中文字体并设置 matplotlib 全局参数，返回字体名；找不到中文字体时报错 (不输出满是方框的图)"""
+    plt.rcParams['axes.unicode_minus'] = False
+
+    font_path = resolve_cjk_font()
+    if font_path is None:
+        raise RuntimeError(MISSING_FONT_HELP)
+
+    font_manager.fontManager.addfont(font_path)
+    font_name = font_manager.FontProperties(fname=font_path).get_name()
+    plt.rcParams['font.sans-serif'] = [font_name] + plt.rcParams['font.sans-serif']
+    return font_name
+
+def matrix_hash(df, title, options):
+    """根据矩阵内容、行列标签与绘图参数计算哈希"""
+    h = hashlib.sha256()
+    h.update(df.to_numpy(dtype='float64').tobytes())
+    h.update(json.dumps([list(map(str, df.index)), list(map(str, df.columns))],
+                        ensure_ascii=False).encode('utf-8'))
+    h.update(json.dumps([title, options], sort_keys=True, default=str,
+                        ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+def _is_cached(save_path, digest):
+    hash_path = save_path + HASH_SUFFIX
+    if not os.path.exists(save_path) or not os.path.exists(hash_path):
+        return False
+    with open(hash_path, 'r', encoding='utf-8') as f:
+        return f.read().strip() == digest
+
+def render_heatmap(df, save_path, title, force=False, **options):
+    """
+    绘制单张热力图
+    矩阵与参数均未变化且图片已存在时直接跳过，返回是否实际重绘
+    """
+    opts = dict(DEFAULT_OPTIONS)
+    opts.update(options)
+
+    digest = matrix_hash(df, title, opts)
+    if not force and _is_cached(save_path, digest):
+        print(f"  -> [跳过] 矩阵未变化，沿用已有图片: {save_path}")
+        return False
+
+    setup_cjk_font()
+
+    save_dir = os.path.dirname(save_path)
+    if save_dir and not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+
+    fig = plt.figure(figsize=opts['figsize'])
+    try:
+        sns.heatmap(df,
+                    annot=opts['annot'],
+                    fmt=opts['fmt'],
+                    cmap=opts['cmap'],
+                    vmin=opts['vmin'],
+                    vmax=opts['vmax'],
+                    center=opts['center'],
+                    square=opts['square'],
+                    linewidths=opts['linewidths'])
+        if opts['title_fontsize']:
+            plt.title(title, fontsize=opts['title_fontsize'])
+        else:
+            plt.title(title)
+        plt.tight_layout()
+        fig.savefig(save_path, dpi=opts['dpi'])
+    finally:
+        plt.close(fig)
+
+    with open(save_path + HASH_SUFFIX, 'w', encoding='utf-8') as f:
+        f.write(digest)
+
+    print(f"  -> [图片] 热力图已保存: {save_path}")
+    return True
+
+def render_preset(df, save_path, preset, **overrides):
+    """按预设样式绘制热力图"""
+    opts = dict(HEATMAP_PRESETS[preset])
+    opts.update(overrides)
+    title = opts.pop('title')
+    return render_heatmap(df, save_path, title, **opts)
+
+def _render_job(job):
+    job = dict(job)
+    return render_heatmap(job.pop('df'), job.pop('save_path'), job.pop('title'), **job)
+
+def render_heatmaps(jobs, max_workers=None):
+    """
+    多进程并行绘制多张热力图
+    jobs: [{'df': ..., 'save_path': ..., 'title': ..., 其余为 render_heatmap 参数}, ...]
+    """
+    if not jobs:
+        return []
+    if len(jobs) == 1 or max_workers == 1:
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render_job, jobs))
+
+def difference_bound(df):
+    """差值热力图的对称色阶上下界"""
+    return max(abs(df.min().min()), abs(df.max().max()))
+
+def render_all_saved_matrices(max_workers=None):
+    """读取已保存的相似度矩阵，并行重绘全部热力图"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    jobs = []
+    for preset, matrix_file, image_file in BATCH_JOBS:
+        matrix_path = os.path.join(base_dir, matrix_file)
+        if not os.path.exists(matrix_path):
+            print(f"  [警告] 找不到矩阵文件，跳过: {matrix_path}")
+            continue
+
+        df = pd.read_excel(matrix_path, index_col=0)
+        job = dict(HEATMAP_PRESETS[preset])
+        if preset == 'difference':
+            bound = difference_bound(df)
+            job.update({'vmin': -bound, 'vmax': bound})
+        job.update({'df': df, 'save_path': os.path.join(base_dir, image_file)})
+        jobs.append(job)
+
+    drawn = render_heatmaps(jobs, max_workers=max_workers)
+    print(f"任务完成：重绘 {sum(drawn)} 张，跳过 {len(drawn) - sum(drawn)} 张")
+
+if __name__ == "__main__":
+    render_all_saved_matrices()
@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import glob
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from heatmap_render import render_preset, difference_bound
+from corpus_stats import file_signature
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.script_loader import load_script
+
+# ================= 路径配置区域 =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SOURCE_DIR = os.path.join(BASE_DIR, "country-orgin")
+KEYWORD_DIR = os.path.join(BASE_DIR, "TOP-K keyword")
+WEIGHTS_DIR = os.path.join(BASE_DIR, "country-keyword")
+
+# 各国 DF 计数与已处理文件列表 (每个国家一个 JSON)
+STATE_DIR = os.path.join(BASE_DIR, "incremental_state")
+
+# 需要按行/列增量更新的相似度矩阵
+WEIGHTED_SIM_PATH = os.path.join(BASE_DIR, "keyword_based_cosine_weighted", "Task2_Weighted_Cosine_Similarity.xlsx")
+WEIGHTED_HEATMAP_PATH = os.path.join(BASE_DIR, "keyword_based_cosine_weighted", "Task3_Weighted_Heatmap.png")
+BERT_SIM_PATH = os.path.join(BASE_DIR, "bert", "Task2_BERT_Similarity.xlsx")
+BERT_HEATMAP_PATH = os.path.join(BASE_DIR, "bert", "Task3_BERT_Heatmap.png")
+DIFF_PATH = os.path.join(BASE_DIR, "Task3_Difference_Matrix.xlsx")
+DIFF_HEATMAP_PATH = os.path.join(BASE_DIR, "Task3_Difference_Heatmap.png")
+
+# 国家 BERT 向量缓存 (权重表未变化的国家不再重新编码)
+EMBEDDING_CACHE_PATH = os.path.join(STATE_DIR, "bert_embeddings.json")
+
+# ==============================================
+
+def append_keyword_rows(keyword_path, rows):
+    """将新文档的关键词行追加到 *_keywords.csv (已有文件不能再写 BOM)"""
+    if not rows:
+        return
+    os.makedirs(os.path.dirname(keyword_path), exist_ok=True)
+    file_exists = os.path.exists(keyword_path)
+    pd.DataFrame(rows, columns=['file_name', 'keywords', 'count', 'text_length']).to_csv(
+        keyword_path, mode='a', header=not file_exists, index=False,
+        encoding='utf-8' if file_exists else 'utf-8-sig'
+    )
+
+class CountryState:
+    """
+    单个国家的增量状态：关键词 DF 计数、已计入的文件名与无法提取的文件名
+    保存时记录 <国家>_keywords.csv 的指纹，关键词文件被改写 (如全量重跑 TOP-K) 后状态失效
+    """
+    def __init__(self, country, df_counts=None, file_names=None, skipped_files=None, signature=None):
+        self.country = country
+        self.df_counts = Counter(df_counts or {})
+        self.file_names = set(file_names or [])
+        self.skipped_files = set(skipped_files or [])
+        self.signature = signature
+
+    @property
+    def path(self):
+        return os.path.join(STATE_DIR, f"{self.country}.json")
+
+    @property
+    def keyword_path(self):
+        return os.path.join(KEYWORD_DIR, f"{self.country}_keywords.csv")
+
+    def keyword_signature(self):
+        """关键词文件的当前指纹 (大小与修改时间)，文件不存在时为 None"""
+        return file_signature(self.keyword_path) if os.path.exists(self.keyword_path) else None
+
+    def is_stale(self):
+        return self.signature != self.keyword_signature()
+
+    @classmethod
+    def load(cls, country, wcloud):
+        """
+        读取状态文件；不存在或与 <国家>_keywords.csv 的指纹不一致时，从关键词文件全量构建
+        (否则重跑 TOP-K 后再增量更新会把文档重复计入 DF)
+        """
+        state = cls(country)
+        if os.path.exists(state.path):
+            with open(state.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            saved = cls(country, data['df'], data['file_names'], data.get('skipped_files'),
+                        data.get('keywords_signature'))
+            if not saved.is_stale():
+                return saved
+            print(f"  -> [{country}] 关键词文件已变化，丢弃旧状态")
+            # 空文档列表来自国家目录而非关键词文件，重建时保留
+            state.skipped_files = saved.skipped_files
+
+        keyword_path = state.keyword_path
+        state.signature = state.keyword_signature()
+        if os.path.exists(keyword_path):
+            df = wcloud.read_keyword_csv(keyword_path)
+            state.df_counts = wcloud.count_document_frequency(df)
+            state.file_names = set(df['file_name'].astype(str))
+            print(f"  -> [{country}] 已从关键词文件初始化状态 ({len(state.file_names)} 篇, {len(state.df_counts)} 个词)")
+        return state
+
+    def save(self):
+        """保存状态 (需在新行追加到关键词文件之后调用，记录的指纹才与文件一致)"""
+        self.signature = self.keyword_signature()
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'country': self.country,
+                'keywords_signature': self.signature,
+                'docs': len(self.file_names),
+                'file_names': sorted(self.file_names),
+                'skipped_files': sorted(self.skipped_files),
+                'df': dict(self.df_counts),
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def new_rows(self, rows):
+        """过滤掉已经计入的文档"""
+        seen = set()
+        fresh = []
+        for row in rows:
+            name = str(row['file_name'])
+            if name in self.file_names or name in seen:
+                continue
+            seen.add(name)
+            fresh.append(row)
+        return fresh
+
+    def add_rows(self, rows, wcloud):
+        """只把新文档的关键词计入 DF"""
+        if not rows:
+            return
+        self.df_counts.update(wcloud.count_document_frequency(pd.DataFrame(rows)))
+        self.file_names.update(str(row['file_name']) for row in rows)
+
+class IncrementalUpdater:
+    """
+    新文档到达后的增量更新：
+      1. 只把新文档的关键词计入该国家的 DF 计数
+      2. 只为该国家重新计算 Zipf 截断与 High/Low 梯队，写出 <国家>_Weights.csv
+      3. 只重算相似度矩阵中该国家所在的行与列，并刷新热力图
+    embed_fn: 可选，接收国家文本返回向量，用于同步更新 BERT 相似度矩阵
+    """
+    def __init__(self, embed_fn=None, render=True):
+        self.wcloud = load_script(os.path.join(BASE_DIR, "word cloud.py"), "word_cloud")
+        self.cosine = load_script(os.path.join(BASE_DIR, "keyword_based_cosine_weighted", "keyword_based_cosine_weighted.py"),
+                                  "keyword_based_cosine_weighted")
+        self.embed_fn = embed_fn
+        self.render = render
+        self.states = {}
+        self._bert = None
+
+    def state(self, country):
+        # 常驻进程中关键词文件被外部改写时同样重新加载
+        if country not in self.states or self.states[country].is_stale():
+            self.states[country] = CountryState.load(country, self.wcloud)
+        return self.states[country]
+
+    def apply(self, country, rows):
+        """
+        rows: 与 *_keywords.csv 同结构的新文档记录 (file_name, keywords, ...)
+        新行追加到关键词文件与计入 DF 在这里一起完成，保存的状态指纹与关键词文件保持一致
+        """
+        state = self.state(country)
+        fresh = state.new_rows(rows)
+        if not fresh:
+            return {'country': country, 'added': 0}
+
+        append_keyword_rows(state.keyword_path, fresh)
+        state.add_rows(fresh, self.wcloud)
+        state.save()
+
+        weights = self.update_weights(country, state)
+        summary = {'country': country, 'added': len(fresh), 'weights': weights}
+        summary['similarity'] = self.update_similarity(country)
+        return summary
+
+    def update_weights(self, country, state):
+        # 开启 ADAPTIVE_CUTOFF 时沿用已缓存的 Zipf 截断参数，不因新增少量文档重新拟合
+        params = self.wcloud.cutoff_params(country, state.df_counts)
+        final_items, target_n, n_high = self.wcloud.select_keywords(state.df_counts, params=params)
+        weight_df = self.wcloud.build_weight_frame(
+            final_items, params['priority_min_df'] if params else self.wcloud.PRIORITY_MIN_DF)
+
+        os.makedirs(WEIGHTS_DIR, exist_ok=True)
+        weight_df.to_csv(os.path.join(WEIGHTS_DIR, f"{country}_Weights.csv"), index=False, encoding='utf-8-sig')
+        return {'target_n': target_n, 'high_df': n_high, 'vocab_size': len(state.df_counts)}
+
+    def update_similarity(self, country):
+        """只更新该国家所在的行与列"""
+        data_dict = self.cosine.load_country_weights(WEIGHTS_DIR)
+        if country not in data_dict:
+            return {}
+
+        if os.path.exists(WEIGHTED_SIM_PATH):
+            df_kw = pd.read_excel(WEIGHTED_SIM_PATH, index_col=0)
+            df_kw = self.cosine.update_similarity_row(df_kw, data_dict, country)
+        else:
+            df_kw = self.cosine.compute_similarity(data_dict)
+        df_kw.to_excel(WEIGHTED_SIM_PATH)
+        self._render(df_kw, WEIGHTED_HEATMAP_PATH, 'weighted')
+
+        result = {'weighted_row': df_kw.loc[country].round(4).to_dict()}
+
+        if self.embed_fn is not None:
+            df_bert = self.update_bert_row(country)
+            result['bert_row'] = df_bert.loc[country].round(4).to_dict()
+            self.update_difference(df_bert, df_kw)
+
+        return result
+
+    def _render(self, df, output_path, preset, **kwargs):
+        """刷新热力图；矩阵与关键词文件此时都已写盘，绘图失败 (如缺少中文字体) 只记录不中断更新"""
+        if not self.render:
+            return
+        try:
+            render_preset(df, output_path, preset, **kwargs)
+        except Exception as e:
+            print(f"  [警告] 热力图绘制失败 ({os.path.basename(output_path)}): {e}")
+
+    # ---------------- BERT 矩阵 ----------------
+
+    def _bert_module(self):
+        if self._bert is None:
+            self._bert = load_script(os.path.join(BASE_DIR, "bert", "Bert.py"), "bert_similarity")
+        return self._bert
+
+    def _country_text(self, country):
+        df = pd.read_csv(os.path.join(WEIGHTS_DIR, f"{country}_Weights.csv"))
+        df.columns = [c.strip() for c in df.columns]
+        return self._bert_module().build_country_text(df)
+
+    def update_bert_row(self, country):
+        cache = {}
+        if os.path.exists(EMBEDDING_CACHE_PATH):
+            with open(EMBEDDING_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+
+        countries = [os.path.basename(p).split('_')[0] for p in glob.glob(os.path.join(WEIGHTS_DIR, '*_Weights.csv'))]
+        refreshed = []
+        for name in countries:
+            mtime = os.path.getmtime(os.path.join(WEIGHTS_DIR, f"{name}_Weights.csv"))
+            cached = cache.get(name)
+            if name == country or cached is None or cached['mtime'] != mtime:
+                cache[name] = {'mtime': mtime, 'vector': list(map(float, self.embed_fn(self._country_text(name))))}
+                refreshed.append(name)
+
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(EMBEDDING_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+
+        if os.path.exists(BERT_SIM_PATH):
+            df_bert = pd.read_excel(BERT_SIM_PATH, index_col=0)
+        else:
+            df_bert = pd.DataFrame(dtype=float)
+        names = [c for c in df_bert.index if c in cache] + [c for c in countries if c not in df_bert.index]
+        df_bert = df_bert.reindex(index=names, columns=names)
+
+        # 重新编码过的国家 (含本次更新的国家和新增国家) 才需要重算行列
+        vectors = {name: np.asarray(cache[name]['vector']) for name in names}
+        for name in refreshed:
+            vec = vectors[name]
+            for other in names:
+                other_vec = vectors[other]
+                denom = np.linalg.norm(vec) * np.linalg.norm(other_vec)
+                score = float(vec @ other_vec / denom) if denom else 0.0
+                df_bert.loc[name, other] = score
+                df_bert.loc[other, name] = score
+
+        df_bert.to_excel(BERT_SIM_PATH)
+        self._render(df_bert, BERT_HEATMAP_PATH, 'bert')
+        return df_bert
+
+    def update_difference(self, df_bert, df_kw):
+        common = df_bert.index.intersection(df_kw.index)
+        df_diff = df_bert.loc[common, common] - df_kw.loc[common, common]
+        df_diff.to_excel(DIFF_PATH)
+        bound = difference_bound(df_diff)
+        self._render(df_diff, DIFF_HEATMAP_PATH, 'difference', vmin=-bound, vmax=bound)
+
+def scan_country(updater, engine, country):
+    """找出国家目录中尚未计入的 txt，提取关键词并增量更新"""
+    country_dir = os.path.join(SOURCE_DIR, country)
+    if not os.path.isdir(country_dir):
+        print(f"[错误] 找不到国家目录: {country_dir}")
+        return None
+
+    state = updater.state(country)
+    new_files = sorted(f for f in os.listdir(country_dir)
+                       if f.lower().endswith('.txt') and f not in state.file_names and f not in state.skipped_files)
+    print(f"\n[{country}] 发现 {len(new_files)} 篇新文档")
+    if not new_files:
+        return {'country': country, 'added': 0}
+
+    documents = [{'file_name': f, 'text': engine.topk.read_text(os.path.join(country_dir, f))} for f in new_files]
+    rows = [r for r in engine.extract(country, documents) if 'error' not in r]
+
+    # 空文档记入状态，避免每次都被当作新文档重新扫描
+    extracted = {r['file_name'] for r in rows}
+    state.skipped_files.update(f for f in new_files if f not in extracted)
+    state.save()
+
+    summary = updater.apply(country, rows)
+    if summary['added']:
+        print(f"  -> 新增 {summary['added']} 篇，权重表 {summary['weights']['target_n']} 个词，相似度行已更新")
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="增量更新国家权重与相似度矩阵")
+    parser.add_argument('countries', nargs='+', help="有新文档的国家 (country-orgin 下的文件夹名)")
+    parser.add_argument('--with-bert', action='store_true', help="同时更新 BERT 相似度矩阵")
+    parser.add_argument('--no-render', action='store_true', help="不刷新热力图")
+    args = parser.parse_args()
+
+    from keyword_service import KeywordEngine, EmbeddingEngine
+
+    engine = KeywordEngine()
+    embed_fn = None
+    if args.with_bert:
+        embedder = EmbeddingEngine()
+        embed_fn = lambda text: embedder.encode_texts([text])[0]
+
+    updater = IncrementalUpdater(embed_fn=embed_fn, render=not args.no_render)
+    for country in args.countries:
+        scan_country(updater, engine, country)
@@ -0,0 +1,313 @@
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from heatmap_render import render_preset
+
+# ================= 路径配置区域 =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+KEYWORD_DIR = os.path.join(BASE_DIR, "TOP-K keyword")
+OUTPUT_DIR = os.path.join(BASE_DIR, "keyword-community")
+
+# ================= 构图与聚类配置 =================
+
+# 关键词至少出现在 MIN_DF 篇文档中才进入全局图 (与 word cloud.py 的 DF 阈值一致)
+MIN_DF = 3
+
+# 两个关键词至少在 MIN_COOCCURRENCE 篇文档中同时出现才连边
+MIN_COOCCURRENCE = 2
+
+# Louvain 分辨率 (越大社区越多越小) / 最多聚合层数 / 随机种子 (固定后结果可复现)
+RESOLUTION = 1.0
+MAX_LEVELS = 10
+RANDOM_SEED = 42
+
+# 少于该词数的社区并入 "其他"
+MIN_COMMUNITY_SIZE = 5
+
+# 社区名称取 DF 最高的前几个词
+LABEL_WORDS = 3
+
+# 每对国家输出贡献最大的社区数
+TOP_CONTRIBUTORS = 3
+
+OTHER_LABEL = "其他"
+
+# ==============================================
+
+def _read_keyword_csv(file_path):
+    """读取 TOP-K 关键词文件 (utf-8 失败时回退 gb18030)"""
+    try:
+        return pd.read_csv(file_path, encoding='utf-8-sig', usecols=['file_name', 'keywords'])
+    except UnicodeDecodeError:
+        return pd.read_csv(file_path, encoding='gb18030', usecols=['file_name', 'keywords'])
+
+def load_document_keywords(keyword_dir=KEYWORD_DIR):
+    """
+    读取全部 <国家>_keywords.csv，展开为 (文档, 国家, 关键词) 长表
+    同一文档内重复的关键词只计一次
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(keyword_dir, "*_keywords.csv"))):
+        country = os.path.basename(path).split('_')[0]
+        df = _read_keyword_csv(path).dropna(subset=['keywords'])
+        df['country'] = country
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['doc', 'country', 'keyword'])
+
+    docs = pd.concat(frames, ignore_index=True)
+    docs['doc'] = np.arange(len(docs))
+    long = docs[['doc', 'country']].join(
+        docs['keywords'].astype(str).str.split(',').explode().str.strip().rename('keyword')
+    )
+    long = long[long['keyword'] != '']
+    return long.drop_duplicates(['doc', 'keyword'], ignore_index=True)
+
+def build_doc_term_matrix(long, min_df=MIN_DF):
+    """
+    稀疏 文档×关键词 0/1 矩阵 (只保留 DF >= min_df 的词)
+    返回 (矩阵, 词表, 每篇文档所属国家)
+    """
+    df_counts = long['keyword'].value_counts(sort=False)
+    kept = long[long['keyword'].map(df_counts) >= min_df]
+
+    term_codes, vocab = pd.factorize(kept['keyword'], sort=True)
+    n_docs = int(long['doc'].max()) + 1 if len(long) else 0
+    matrix = sp.csr_matrix(
+        (np.ones(len(kept), dtype=np.float64), (kept['doc'].to_numpy(), term_codes)),
+        shape=(n_docs, len(vocab)),
+    )
+    doc_country = long.drop_duplicates('doc').set_index('doc')['country'].reindex(range(n_docs))
+    return matrix, pd.Index(vocab), doc_country.to_numpy()
+
+def build_cooccurrence_graph(doc_term, min_cooccurrence=MIN_COOCCURRENCE):
+    """
+    全局共现图 C = Xᵀ X (稀疏累加，不做逐对循环)
+    边权用 Ochiai 系数 c_ij / sqrt(df_i · df_j) 归一化，避免 "合作"、"发展" 等高频词把所有词吸进同一社区
+    返回 (邻接矩阵, DF, 原始共现次数矩阵)
+    """
+    cooc = (doc_term.T @ doc_term).tocsr()
+    doc_freq = cooc.diagonal()
+    cooc.setdiag(0)
+    cooc.data[cooc.data < min_cooccurrence] = 0
+    cooc.eliminate_zeros()
+
+    inv_sqrt = sp.diags(1.0 / np.sqrt(np.maximum(doc_freq, 1)))
+    adjacency = (inv_sqrt @ cooc @ inv_sqrt).tocsr()
+    return adjacency, doc_freq, cooc
+
+def _local_moving(adjacency, resolution, rng):
+    """
+    Louvain 第一阶段：按随机顺序逐个把节点移到使模块度增益最大的相邻社区，直至不再移动
+    增益 ∝ k_i,in(c) - γ · tot(c) · k_i / 2m
+    """
+    n = adjacency.shape[0]
+    indptr, indices, data = adjacency.indptr, adjacency.indices, adjacency.data
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    total = degree.sum()
+
+    comm = np.arange(n)
+    tot = degree.copy()
+    moved_any = False
+
+    while True:
+        moved = 0
+        for i in rng.permutation(n):
+            nbrs = indices[indptr[i]:indptr[i + 1]]
+            weights = data[indptr[i]:indptr[i + 1]]
+            not_self = nbrs != i
+            nbrs, weights = nbrs[not_self], weights[not_self]
+
+            current = comm[i]
+            tot[current] -= degree[i]
+            if len(nbrs) == 0:
+                tot[current] += degree[i]
+                continue
+
+            # 各相邻社区与节点 i 之间的边权和
+            cands, inverse = np.unique(comm[nbrs], return_inverse=True)
+            k_in = np.bincount(inverse, weights=weights)
+            gains = k_in - resolution * tot[cands] * degree[i] / total
+
+            pos = np.searchsorted(cands, current)
+            stay = gains[pos] if pos < len(cands) and cands[pos] == current else \
+                -resolution * tot[current] * degree[i] / total
+            best = int(np.argmax(gains))
+            target = cands[best] if gains[best] > stay + 1e-12 else current
+
+            tot[target] += degree[i]
+            if target != current:
+                comm[i] = target
+                moved += 1
+        if not moved:
+            break
+        moved_any = True
+
+    return comm, moved_any
+
+def louvain(adjacency, resolution=RESOLUTION, max_levels=MAX_LEVELS, seed=RANDOM_SEED):
+    """
+    Louvain 社区划分：局部移动 + 社区聚合 (聚合用稀疏乘法 Hᵀ A H) 交替进行，直至划分不再变化
+    返回每个节点的社区编号 (0..k-1)
+    """
+    rng = np.random.default_rng(seed)
+    partition = np.arange(adjacency.shape[0])
+    graph = adjacency.tocsr()
+
+    for _ in range(max_levels):
+        comm, moved = _local_moving(graph, resolution, rng)
+        if not moved:
+            break
+        _, comm = np.unique(comm, return_inverse=True)
+        partition = comm[partition]
+
+        onehot = sp.csr_matrix((np.ones(len(comm)), (np.arange(len(comm)), comm)))
+        graph = (onehot.T @ graph @ onehot).tocsr()
+
+    _, partition = np.unique(partition, return_inverse=True)
+    return partition
+
+def modularity(adjacency, labels):
+    """加权模块度 Q = Σ_c [ in_c / 2m - (tot_c / 2m)² ]"""
+    total = adjacency.sum()
+    if total == 0:
+        return 0.0
+    onehot = sp.csr_matrix((np.ones(len(labels)), (np.arange(len(labels)), labels)))
+    inside = (onehot.T @ adjacency @ onehot).diagonal()
+    degree = np.asarray(onehot.T @ adjacency.sum(axis=1)).ravel()
+    return float((inside / total - (degree / total) ** 2).sum())
+
+def summarize_communities(labels, vocab, doc_freq, adjacency, min_size=MIN_COMMUNITY_SIZE):
+    """
+    生成关键词归属表与社区汇总表
+    小于 min_size 的社区并入 "其他"；社区名称取 DF 最高的 LABEL_WORDS 个词
+    """
+    strength = np.asarray(adjacency.sum(axis=1)).ravel()
+    words = pd.DataFrame({
+        'keyword': vocab,
+        'community_id': labels,
+        'df': doc_freq.astype(int),
+        'strength': strength,
+    })
+
+    sizes = words['community_id'].value_counts()
+    small = sizes.index[sizes < min_size]
+    words.loc[words['community_id'].isin(small), 'community_id'] = -1
+
+    words = words.sort_values(['community_id', 'df', 'keyword'], ascending=[True, False, True])
+    names = {-1: OTHER_LABEL}
+    for cid, group in words[words['community_id'] >= 0].groupby('community_id', sort=False):
+        names[cid] = "/".join(group['keyword'].head(LABEL_WORDS))
+    words['community'] = words['community_id'].map(names)
+
+    summary = words.groupby(['community_id', 'community']).agg(
+        size=('keyword', 'size'),
+        total_df=('df', 'sum'),
+        keywords=('keyword', lambda s: ",".join(s.head(20))),
+    ).reset_index().sort_values('total_df', ascending=False, ignore_index=True)
+    # 索引保持为词表下标，供 country_profiles 对齐
+    return words, summary
+
+def country_profiles(doc_term, doc_country, words, community_order):
+    """
+    各国的社区权重分布：该国文档中属于每个社区的关键词出现次数之和 / 总数
+    行=国家，列=社区
+    """
+    term_community = words.sort_index()['community'].to_numpy()
+    col_codes = pd.Index(community_order).get_indexer(term_community)
+    membership = sp.csr_matrix(
+        (np.ones(len(col_codes)), (np.arange(len(col_codes)), col_codes)),
+        shape=(len(col_codes), len(community_order)),
+    )
+
+    countries = pd.Index(sorted(set(doc_country)))
+    country_codes = countries.get_indexer(doc_country)
+    doc_membership = sp.csr_matrix(
+        (np.ones(len(country_codes)), (country_codes, np.arange(len(country_codes)))),
+        shape=(len(countries), len(country_codes)),
+    )
+
+    counts = (doc_membership @ doc_term @ membership).toarray()
+    totals = counts.sum(axis=1, keepdims=True)
+    shares = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    return pd.DataFrame(shares, index=countries, columns=community_order)
+
+def similarity_contributions(profile, top_n=TOP_CONTRIBUTORS):
+    """
+    按社区分解国家间社区分布的余弦相似度：
+    cos(a, b) = Σ_k a_k · b_k / (|a| |b|)，每个社区的一项即其贡献
+    """
+    values = profile.to_numpy()
+    norms = np.linalg.norm(values, axis=1)
+    rows = []
+    names = list(profile.index)
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            denom = norms[i] * norms[j]
+            if denom == 0:
+                continue
+            parts = values[i] * values[j] / denom
+            cosine = parts.sum()
+            row = {'country_a': names[i], 'country_b': names[j], 'community_cosine': round(float(cosine), 4)}
+            for rank, k in enumerate(np.argsort(-parts, kind='stable')[:top_n], start=1):
+                row[f'top{rank}_community'] = profile.columns[k]
+                row[f'top{rank}_share'] = round(float(parts[k] / cosine), 4) if cosine else 0.0
+            rows.append(row)
+    return pd.DataFrame(rows).sort_values('community_cosine', ascending=False, ignore_index=True)
+
+def main():
+    if not os.path.exists(KEYWORD_DIR):
+        print(f"错误：找不到关键词目录 {KEYWORD_DIR}，请先运行 TOP-K.py")
+        return
+
+    print("正在读取各国关键词...")
+    long = load_document_keywords(KEYWORD_DIR)
+    if long.empty:
+        print("错误：未找到 *_keywords.csv 文件！")
+        return
+
+    doc_term, vocab, doc_country = build_doc_term_matrix(long)
+    print(f"-> {doc_term.shape[0]} 篇文档，DF >= {MIN_DF} 的关键词 {len(vocab)} 个")
+
+    adjacency, doc_freq, cooc = build_cooccurrence_graph(doc_term)
+    print(f"-> 共现边 {cooc.nnz // 2} 条 (共现次数 >= {MIN_COOCCURRENCE})")
+
+    print("正在进行社区划分 (Louvain)...")
+    labels = louvain(adjacency)
+    print(f"-> 模块度 Q = {modularity(adjacency, labels):.4f}")
+
+    words, summary = summarize_communities(labels, vocab, doc_freq, adjacency)
+    community_order = [c for c in summary['community'] if c != OTHER_LABEL]
+    if OTHER_LABEL in set(summary['community']):
+        community_order.append(OTHER_LABEL)
+    print(f"-> 共 {len(community_order) - (OTHER_LABEL in community_order)} 个社区 (另有 "
+          f"{int((words['community_id'] < 0).sum())} 个词归入 {OTHER_LABEL})")
+
+    profile = country_profiles(doc_term, doc_country, words, community_order)
+    contributions = similarity_contributions(profile)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    words.drop(columns='community_id').to_csv(
+        os.path.join(OUTPUT_DIR, "community_keywords.csv"), index=False, encoding='utf-8-sig')
+    summary.to_csv(os.path.join(OUTPUT_DIR, "communities.csv"), index=False, encoding='utf-8-sig')
+
+    profile_path = os.path.join(OUTPUT_DIR, "Country_Community_Profile.xlsx")
+    with pd.ExcelWriter(profile_path) as writer:
+        profile.to_excel(writer, sheet_name='profile')
+        contributions.to_excel(writer, sheet_name='similarity_contribution', index=False)
+    print(f"\n[成功] 国家社区分布已保存: {profile_path}")
+
+    try:
+        render_preset(profile, os.path.join(OUTPUT_DIR, "Country_Community_Heatmap.png"), 'community')
+    except Exception as e:
+        print(f"绘图报错: {e}")
+
+    print("\n任务完成！")
+
+if __name__ == "__main__":
+    main()
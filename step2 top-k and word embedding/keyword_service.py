@@ -0,0 +1,338 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import jieba.analyse
+
+import incremental_update
+from incremental_update import IncrementalUpdater
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.script_loader import load_script
+
+# ================= 路径配置区域 =================
+# 原文、关键词与权重目录统一沿用 incremental_update.py 的配置
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ================= 服务配置 =================
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 单次请求最多接受的文档数
+MAX_BATCH_SIZE = 500
+
+# ==============================================
+
+class KeywordEngine:
+    """常驻的 TOP-K 提取引擎：jieba 词典与固定词表只在启动时加载一次"""
+    def __init__(self):
+        self.topk = load_script(os.path.join(BASE_DIR, "TOP-K.py"), "topk")
+        self.topk.STOPWORDS_PATH = os.path.join(incremental_update.SOURCE_DIR, "cn_stopwords.txt")
+
+        start = time.perf_counter()
+        jieba.initialize()
+        self.topk.init_jieba_environment()
+        # 分词后端与 TOP-K.py 的 SEGMENTER 一致；批量后端按请求中的整批文档一次切分
+        self.tokenizer, _ = self.topk.init_segmenter()
+        self.base_stopwords = self.topk.get_base_stopwords()
+        self.warmup_seconds = time.perf_counter() - start
+
+        # 开启 ADAPTIVE_TOP_K 时沿用 TOP-K.py 已缓存的各国拟合参数 (服务内不重新拟合)
+        self.stats = self.topk.corpus_stats.CorpusStats() if self.topk.ADAPTIVE_TOP_K else None
+
+        self.current_country = None
+        self.docs_processed = 0
+        # jieba 的停用词与分词器是进程级全局状态，提取过程需串行
+        self.lock = threading.Lock()
+
+    def _apply_country_stopwords(self, country):
+        """切换国家时整体替换停用词集合 (与 TOP-K.py 相同)"""
+        if country == self.current_country:
+            return
+        self.topk.apply_country_stopwords(self.base_stopwords, country)
+        self.current_country = country
+
+    def extract(self, country, documents):
+        """对一批文档执行动态 TopK 双算法提取，返回与 *_keywords.csv 同结构的记录"""
+        results = []
+        with self.lock:
+            self._apply_country_stopwords(country)
+            top_k_params = self.stats.get('topk', country) if self.stats else None
+            texts = [doc['text'].replace('\n', '').strip() for doc in documents]
+            self.tokenizer.prime(texts)
+            for doc, content_clean in zip(documents, texts):
+                if not content_clean:
+                    results.append({'file_name': doc['file_name'], 'error': 'empty'})
+                    continue
+                final_keywords = self.topk.extract_keywords(content_clean, top_k_params)
+                results.append({
+                    'file_name': doc['file_name'],
+                    'keywords': ",".join(final_keywords),
+                    'count': len(final_keywords),
+                    'text_length': len(content_clean),
+                })
+            self.docs_processed += len(documents)
+        return results
+
+class EmbeddingEngine:
+    """常驻的 Sentence-BERT 引擎 (可选，需安装 sentence_transformers)"""
+    def __init__(self):
+        self.bert = load_script(os.path.join(BASE_DIR, "bert", "Bert.py"), "bert_similarity")
+
+        start = time.perf_counter()
+        self.model = self.bert.load_model()
+        self.warmup_seconds = time.perf_counter() - start
+
+        # 国家向量缓存: {国家: (权重文件 mtime, 向量)}
+        # 模型与缓存共用一把锁 (处理线程并发访问)；encode_country 内会调用 encode_texts，因此用可重入锁
+        self.country_cache = {}
+        self.lock = threading.RLock()
+
+    def encode_texts(self, texts):
+        with self.lock:
+            vectors = self.model.encode(texts, batch_size=32, convert_to_numpy=True)
+        return [v.tolist() for v in vectors]
+
+    def encode_country(self, country):
+        """按 Bert.py 的规则生成国家文本并编码，权重文件未变化时直接返回缓存"""
+        weights_path = os.path.join(incremental_update.WEIGHTS_DIR, f"{country}_Weights.csv")
+        if not os.path.exists(weights_path):
+            raise KeyError(f"找不到国家权重文件: {weights_path}")
+
+        with self.lock:
+            mtime = os.path.getmtime(weights_path)
+            cached = self.country_cache.get(country)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            df = pd.read_csv(weights_path)
+            df.columns = [c.strip() for c in df.columns]
+            vector = self.encode_texts([self.bert.build_country_text(df)])[0]
+            self.country_cache[country] = (mtime, vector)
+            return vector
+
+class KeywordStore:
+    """
+    将新文档的原文与关键词写回磁盘，并增量更新国家权重与相似度矩阵
+    请求路径内不重绘热力图 (每次最多三张、其中一张 300 dpi)，需要时单独运行 heatmap_render.py
+    """
+    def __init__(self, embed_fn=None):
+        self.updater = IncrementalUpdater(embed_fn=embed_fn, render=False)
+        self.lock = threading.Lock()
+
+    def persist(self, country, documents, results):
+        """
+        1. 原文写入 SOURCE_DIR/<国家>/，便于之后全量重跑
+        2. 新关键词行追加到 <国家>_keywords.csv (已计入的 file_name 跳过)
+        3. 只把新文档计入该国家的 DF，重算其权重表及相似度矩阵中对应的行列
+        """
+        with self.lock:
+            ok_rows = [r for r in results if 'error' not in r]
+            fresh = self.updater.state(country).new_rows(ok_rows)
+            fresh_names = {r['file_name'] for r in fresh}
+            for row in ok_rows:
+                if row['file_name'] not in fresh_names:
+                    row['duplicate'] = True
+
+            if not fresh:
+                return {'appended': 0}
+
+            country_dir = os.path.join(incremental_update.SOURCE_DIR, country)
+            os.makedirs(country_dir, exist_ok=True)
+            texts = {doc['file_name']: doc['text'] for doc in documents}
+            for row in fresh:
+                with open(os.path.join(country_dir, row['file_name']), 'w', encoding='utf-8') as f:
+                    f.write(texts[row['file_name']])
+
+            new_rows = [{k: row[k] for k in ('file_name', 'keywords', 'count', 'text_length')} for row in fresh]
+            summary = self.updater.apply(country, new_rows)
+            return {'appended': summary['added'], 'weights': summary.get('weights'),
+                    'similarity': summary.get('similarity')}
+
+class ServiceState:
+    def __init__(self, with_bert=False, persist=True):
+        print("正在加载 TOP-K 提取引擎...")
+        self.keywords = KeywordEngine()
+        print(f"-> 完成，用时 {self.keywords.warmup_seconds:.2f}s")
+
+        self.embeddings = None
+        embed_fn = None
+        if with_bert:
+            print("正在加载 Sentence-BERT 模型...")
+            self.embeddings = EmbeddingEngine()
+            embed_fn = lambda text: self.embeddings.encode_texts([text])[0]
+            print(f"-> 完成，用时 {self.embeddings.warmup_seconds:.2f}s")
+
+        self.store = KeywordStore(embed_fn=embed_fn) if persist else None
+
+        self.started_at = time.time()
+
+def known_countries():
+    """国家文档库中的文件夹与已有 <国家>_keywords.csv 对应的国家"""
+    countries = set()
+    if os.path.isdir(incremental_update.SOURCE_DIR):
+        countries.update(d for d in os.listdir(incremental_update.SOURCE_DIR)
+                         if os.path.isdir(os.path.join(incremental_update.SOURCE_DIR, d)))
+    if os.path.isdir(incremental_update.KEYWORD_DIR):
+        countries.update(f[:-len("_keywords.csv")] for f in os.listdir(incremental_update.KEYWORD_DIR)
+                         if f.endswith("_keywords.csv"))
+    return countries
+
+def _validate_country(country):
+    """只接受已知国家 (country 会拼进写入路径，不能是 '.'、'..' 或任意新目录)"""
+    if not isinstance(country, str) or not country:
+        raise ValueError("缺少 country")
+    if country not in known_countries():
+        raise ValueError(f"未知国家: {country}")
+    return country
+
+def _normalize_documents(payload):
+    """校验并整理请求中的文档列表"""
+    documents = payload.get('documents')
+    if not isinstance(documents, list) or not documents:
+        raise ValueError("documents 必须是非空列表")
+    if len(documents) > MAX_BATCH_SIZE:
+        raise ValueError(f"单次最多 {MAX_BATCH_SIZE} 篇文档")
+
+    normalized = []
+    for doc in documents:
+        if isinstance(doc, str):
+            doc = {'text': doc}
+        if not isinstance(doc, dict) or not isinstance(doc.get('text'), str):
+            raise ValueError("每篇文档需包含字符串字段 text")
+        file_name = os.path.basename(str(doc.get('file_name') or f"text_{uuid.uuid4()}.txt"))
+        # 下游按 .txt 扫描国家目录与去重，其他文件名会被重复提取或写到文档库之外的位置
+        if not file_name.lower().endswith('.txt') or file_name.lower() == '.txt':
+            raise ValueError(f"file_name 必须是 .txt 文件名: {doc.get('file_name')}")
+        normalized.append({'file_name': file_name, 'text': doc['text']})
+    return normalized
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health                 服务状态
+    POST /keywords               {"country": "日本", "documents": [{"file_name": ..., "text": ...}],
+                                  "persist": true, "embed": false}
+    POST /embed                  {"texts": [...]} 或 {"countries": [...]}
+    """
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length <= 0:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': f"未知路径: {self.path}"})
+            return
+        state = self.state
+        self._send_json(200, {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - state.started_at, 1),
+            'docs_processed': state.keywords.docs_processed,
+            'persist': state.store is not None,
+            'bert_loaded': state.embeddings is not None,
+        })
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            payload = self._read_json()
+            if self.path == '/keywords':
+                body = self._handle_keywords(payload)
+            elif self.path == '/embed':
+                body = self._handle_embed(payload)
+            else:
+                self._send_json(404, {'error': f"未知路径: {self.path}"})
+                return
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            print(f"  [失败] {self.path}: {type(e).__name__}: {e}")
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        body['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        self._send_json(200, body)
+
+    def _handle_keywords(self, payload):
+        state = self.state
+        country = _validate_country(payload.get('country'))
+        documents = _normalize_documents(payload)
+
+        results = state.keywords.extract(country, documents)
+
+        body = {'country': country, 'results': results}
+
+        if payload.get('embed'):
+            if state.embeddings is None:
+                raise ValueError("服务未加载 BERT 模型 (启动时加 --with-bert)")
+            ok = [r for r in results if 'keywords' in r]
+            # 与国家级向量一致，文档向量基于关键词而非全文
+            vectors = state.embeddings.encode_texts([r['keywords'].replace(',', '，') for r in ok]) if ok else []
+            for row, vector in zip(ok, vectors):
+                row['vector'] = vector
+
+        if payload.get('persist', True) and state.store is not None:
+            body['store'] = state.store.persist(country, documents, results)
+
+        return body
+
+    def _handle_embed(self, payload):
+        state = self.state
+        if state.embeddings is None:
+            raise ValueError("服务未加载 BERT 模型 (启动时加 --with-bert)")
+
+        if 'texts' in payload:
+            texts = payload['texts']
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("texts 必须是字符串列表")
+            return {'vectors': state.embeddings.encode_texts(texts)}
+
+        if 'countries' in payload:
+            countries = payload['countries']
+            if not isinstance(countries, list):
+                raise ValueError("countries 必须是列表")
+            return {'vectors': {c: state.embeddings.encode_country(_validate_country(c)) for c in countries}}
+
+        raise ValueError("需提供 texts 或 countries")
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, with_bert=False, persist=True):
+    ServiceHandler.state = ServiceState(with_bert=with_bert, persist=persist)
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    print(f"服务已启动: http://{host}:{port}  (Ctrl+C 退出)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在关闭服务...")
+    finally:
+        server.server_close()
+        ServiceHandler.state.keywords.tokenizer.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="常驻关键词/向量服务：jieba 与 BERT 模型只加载一次")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--with-bert', action='store_true', help="启动时加载 Sentence-BERT 模型，开启 /embed")
+    parser.add_argument('--no-persist', action='store_true', help="只返回结果，不写回关键词与权重文件")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, with_bert=args.with_bert, persist=not args.no_persist)
@@ -0,0 +1,246 @@
+import os
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+
+import jieba
+import jieba.posseg
+import jieba.analyse
+from jieba.posseg import pair
+
+# ================= 分词后端配置 =================
+
+# "jieba"          : 单进程 jieba.posseg (默认，结果与原流程一致)
+# "jieba-parallel" : 多进程 jieba，按文档分发到各进程
+#                    (jieba.enable_parallel 只按换行切分单篇文本且不作用于 posseg 分词器，
+#                     TOP-K.py 去掉了换行，整篇仍在一个进程里切分，因此这里改为按文档并行)
+# "lac"            : 百度 LAC，原生支持批量输入 (需 pip install lac)
+BACKENDS = ("jieba", "jieba-parallel", "lac")
+
+# 并行进程数 (None 为 CPU 核数) / 每个进程一次领取的文档数
+PARALLEL_PROCESSES = None
+PARALLEL_CHUNKSIZE = 8
+
+# LAC 每次送入模型的文档数
+LAC_BATCH_SIZE = 64
+
+# LAC 的实体与专名标签 -> jieba (ICTCLAS) 词性，使 ALLOWED_POS 在各后端下含义一致
+LAC_TAG_MAP = {'PER': 'nr', 'LOC': 'ns', 'ORG': 'nt', 'TIME': 't', 'nw': 'nz'}
+
+# 缓存最近切分的文档数：TF-IDF 与 TextRank 对同一篇正文只切分一次
+CACHE_SIZE = 64
+
+# ==============================================
+
+# 已加载到当前进程 jieba 词典中的固定词 (fork 出的子进程继承该状态，不重复加载)
+_loaded_words = None
+
+def load_user_words(words, tag=None):
+    """
+    把固定词表加入 jieba 词典 (重复调用同一词表时不再加载)
+    jieba.add_word 每次都会累加词频总数，重复加载会改变切分结果，因此必须幂等
+    """
+    global _loaded_words
+    key = (tuple(words), tag)
+    if _loaded_words == key:
+        return 0
+    for word in words:
+        jieba.add_word(word, tag=tag)
+    _loaded_words = key
+    return len(words)
+
+def fixed_word_tags(words, tag=None):
+    """固定词的词性：指定 tag 时统一使用，否则沿用 jieba 词典 (词典中没有的词为 'x')"""
+    if tag:
+        return {w: tag for w in words}
+    jieba.posseg.dt.makesure_userdict_loaded()
+    return {w: jieba.posseg.dt.word_tag_tab.get(w, 'x') for w in words}
+
+class Segmenter:
+    """
+    分词后端的公共接口
+    cut(sentence) 逐个返回 jieba.posseg.pair (word / flag)，可直接作为 jieba TF-IDF / TextRank 的分词器
+    cut_batch(sentences) 一次切分多篇文档，返回每篇的 pair 列表
+    """
+    name = None
+    batched = False
+
+    def __init__(self, user_words=(), tag=None):
+        self.user_words = list(user_words)
+        self.tag = tag
+
+    def cut(self, sentence):
+        return iter(self.cut_batch([sentence])[0])
+
+    def cut_batch(self, sentences):
+        return [list(self.cut(s)) for s in sentences]
+
+    def close(self):
+        pass
+
+class JiebaSegmenter(Segmenter):
+    """单进程 jieba.posseg"""
+    name = "jieba"
+
+    def __init__(self, user_words=(), tag=None):
+        super().__init__(user_words, tag)
+        load_user_words(self.user_words, tag)
+
+    def cut(self, sentence):
+        return jieba.posseg.dt.cut(sentence)
+
+def _init_worker(user_words, tag):
+    jieba.setLogLevel(60)
+    load_user_words(user_words, tag)
+    jieba.posseg.dt.makesure_userdict_loaded()
+
+def _cut_worker(sentence):
+    # 子进程只回传 (词, 词性) 元组，减少序列化开销
+    return [(p.word, p.flag) for p in jieba.posseg.dt.cut(sentence)]
+
+class JiebaParallelSegmenter(JiebaSegmenter):
+    """
+    多进程 jieba：每个进程加载同一固定词表，cut_batch 按文档分发
+    单篇 cut() 仍在主进程切分 (单篇跨进程只会更慢)
+    """
+    name = "jieba-parallel"
+    batched = True
+
+    def __init__(self, user_words=(), tag=None, processes=None, chunksize=None):
+        super().__init__(user_words, tag)
+        self.processes = processes or PARALLEL_PROCESSES or os.cpu_count() or 1
+        self.chunksize = chunksize or PARALLEL_CHUNKSIZE
+        self.pool = None
+
+    def _get_pool(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes, initializer=_init_worker,
+                                             initargs=(self.user_words, self.tag))
+        return self.pool
+
+    def cut_batch(self, sentences):
+        if len(sentences) <= 1:
+            return [list(self.cut(s)) for s in sentences]
+        results = self._get_pool().map(_cut_worker, sentences, chunksize=self.chunksize)
+        return [[pair(w, f) for w, f in items] for items in results]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+class LacSegmenter(Segmenter):
+    """
+    百度 LAC 分词与词性标注，一次送入一批文档
+    固定词表通过 LAC 的自定义词典强制成词，词性统一改为 fixed_word_tags 的结果，与 jieba 后端一致
+    """
+    name = "lac"
+    batched = True
+
+    def __init__(self, user_words=(), tag=None, batch_size=None):
+        super().__init__(user_words, tag)
+        try:
+            from LAC import LAC
+        except ImportError as e:
+            raise ImportError("lac 分词后端需要安装 LAC: pip install lac") from e
+
+        self.batch_size = batch_size or LAC_BATCH_SIZE
+        self.lac = LAC(mode='lac')
+        # 与 jieba 后端共用同一份固定词性 (需先把固定词加入 jieba 词典)
+        load_user_words(self.user_words, tag)
+        self.fixed_tags = fixed_word_tags(self.user_words, tag)
+        if self.user_words:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+                f.write('\n'.join(self.user_words))
+            try:
+                self.lac.load_customization(f.name)
+            finally:
+                os.remove(f.name)
+
+    def _to_pairs(self, words, tags):
+        fixed = self.fixed_tags
+        return [pair(w, fixed.get(w) or LAC_TAG_MAP.get(t, t)) for w, t in zip(words, tags)]
+
+    def cut_batch(self, sentences):
+        results = []
+        for start in range(0, len(sentences), self.batch_size):
+            batch = sentences[start:start + self.batch_size]
+            results.extend(self._to_pairs(words, tags) for words, tags in self.lac.run(batch))
+        return results
+
+_BACKEND_CLASSES = {
+    "jieba": JiebaSegmenter,
+    "jieba-parallel": JiebaParallelSegmenter,
+    "lac": LacSegmenter,
+}
+
+def create_segmenter(name, user_words=(), tag=None, **options):
+    """按名称创建分词后端 (见 BACKENDS)"""
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"未知的分词后端: {name}，可选 {', '.join(BACKENDS)}")
+    return _BACKEND_CLASSES[name](user_words, tag, **options)
+
+class CachedTokenizer:
+    """
+    接入 jieba TF-IDF / TextRank 的分词器
+    - 同一篇正文只切分一次，第二次 (如 TextRank 在 TF-IDF 之后) 直接取缓存
+    - 批量后端先 prime() 一批正文，之后逐篇提取时全部命中缓存
+    """
+    def __init__(self, segmenter, cache_size=CACHE_SIZE):
+        self.segmenter = segmenter
+        self.cache_size = max(cache_size, 1)
+        self.cache = OrderedDict()
+
+    @property
+    def batched(self):
+        return self.segmenter.batched
+
+    def _store(self, sentence, pairs):
+        self.cache[sentence] = pairs
+        self.cache.move_to_end(sentence)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def prime(self, sentences):
+        """批量切分一批正文并放入缓存 (单进程后端无需预切分，直接返回)"""
+        if not self.batched:
+            return
+        todo = list(dict.fromkeys(s for s in sentences if s and s not in self.cache))
+        if not todo:
+            return
+        self.cache_size = max(self.cache_size, len(todo))
+        for sentence, pairs in zip(todo, self.segmenter.cut_batch(todo)):
+            self._store(sentence, pairs)
+
+    def cut(self, sentence, *args, **kwargs):
+        pairs = self.cache.get(sentence)
+        if pairs is None:
+            pairs = list(self.segmenter.cut(sentence))
+            self._store(sentence, pairs)
+        return iter(pairs)
+
+    def lcut(self, sentence, *args, **kwargs):
+        return list(self.cut(sentence))
+
+    def clear(self):
+        self.cache.clear()
+
+    def close(self):
+        self.clear()
+        self.segmenter.close()
+
+def install(tokenizer):
+    """替换 jieba 默认 TF-IDF / TextRank 的分词器，返回原分词器供 uninstall 还原"""
+    tfidf = jieba.analyse.default_tfidf
+    textrank = jieba.analyse.default_textrank
+    previous = (tfidf.postokenizer, textrank.tokenizer)
+    tfidf.postokenizer = tokenizer
+    textrank.tokenizer = textrank.postokenizer = tokenizer
+    return previous
+
+def uninstall(previous):
+    tfidf = jieba.analyse.default_tfidf
+    textrank = jieba.analyse.default_textrank
+    tfidf.postokenizer, textrank.tokenizer = previous
+    textrank.postokenizer = textrank.tokenizer
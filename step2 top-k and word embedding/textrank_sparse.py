@@ -0,0 +1,199 @@
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve_triangular
+import jieba.analyse
+
+# ================= 算法配置 =================
+
+# 阻尼系数 / 共现窗口 (与 jieba.analyse.textrank 保持一致)
+DAMPING = 0.85
+SPAN = 5
+
+# 幂迭代收敛阈值 (相邻两次得分的最大变化) 与最大迭代次数
+TOL = 1e-6
+MAX_ITER = 100
+
+# 迭代方式
+# "power": 向量化幂迭代直至收敛 (默认)
+# "jieba": 复现 jieba 的做法，按词的字典序原地更新 (Gauss-Seidel) 固定 10 轮，
+#          得分与 jieba.analyse.textrank 完全一致，用于与旧结果逐项对比
+METHOD = "power"
+JIEBA_ITERATIONS = 10
+
+# ===========================================
+
+def _extractor():
+    """
+    复用 jieba 默认 TextRank 对象上的分词器与停用词
+    这样 TOP-K.py 的动态停用词、keyword_service 的停用词切换以及诊断计时都无需改动
+    """
+    return jieba.analyse.default_textrank
+
+def build_cooccurrence(sentence, allowPOS, span=SPAN):
+    """
+    分词并构建窗口共现图 (无向、带权)
+    返回 (节点词列表, 对称稀疏邻接矩阵)；节点顺序与 jieba 一致 (按首次出现在共现对中的顺序)
+    """
+    extractor = _extractor()
+    pos_filt = frozenset(allowPOS)
+    stop_words = extractor.stop_words
+
+    # 词性、长度与停用词过滤，未通过的位置记为 -1
+    vocab = {}
+    ids = []
+    for wp in extractor.tokenizer.cut(sentence):
+        word = wp.word
+        if wp.flag in pos_filt and len(word.strip()) >= 2 and word.lower() not in stop_words:
+            ids.append(vocab.setdefault(word, len(vocab)))
+        else:
+            ids.append(-1)
+
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(vocab) == 0 or len(ids) < 2:
+        return [], sp.csr_matrix((0, 0))
+
+    # 窗口内的所有词对 (i, i+k)，k = 1 .. span-1，按 (i, k) 排序以还原 jieba 的插入顺序
+    n = len(ids)
+    pos_i = np.concatenate([np.arange(n - k) for k in range(1, span) if k < n])
+    offset = np.concatenate([np.full(n - k, k) for k in range(1, span) if k < n])
+    order = np.lexsort((offset, pos_i))
+    starts = ids[pos_i[order]]
+    ends = ids[pos_i[order] + offset[order]]
+    keep = (starts >= 0) & (ends >= 0)
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return [], sp.csr_matrix((0, 0))
+
+    # 只保留出现在共现对中的词，并按首次出现顺序重新编号
+    flat = np.empty(len(starts) * 2, dtype=np.int64)
+    flat[0::2], flat[1::2] = starts, ends
+    uniq, first = np.unique(flat, return_index=True)
+    node_ids = uniq[np.argsort(first, kind='stable')]
+    remap = np.full(len(vocab), -1, dtype=np.int64)
+    remap[node_ids] = np.arange(len(node_ids))
+
+    words = np.empty(len(vocab), dtype=object)
+    words[list(vocab.values())] = list(vocab.keys())
+    nodes = words[node_ids].tolist()
+
+    # 每个共现对在两个方向各记一次 (自环计两次，与 jieba 的 addEdge 相同)
+    size = len(nodes)
+    counts = sp.coo_matrix(
+        (np.ones(len(starts)), (remap[starts], remap[ends])), shape=(size, size)
+    ).tocsr()
+    return nodes, (counts + counts.T).tocsr()
+
+def _power_iteration(transition, ws, d, tol, max_iter):
+    """ws = (1 - d) + d * T · ws，直至相邻两次的最大变化小于 tol"""
+    for _ in range(max_iter):
+        updated = (1 - d) + d * (transition @ ws)
+        delta = np.abs(updated - ws).max()
+        ws = updated
+        if delta < tol:
+            break
+    return ws
+
+def _gauss_seidel(transition, ws, d, sweep, iterations):
+    """
+    按 sweep 顺序原地更新 (jieba 的迭代方式)
+    每轮等价于解下三角方程 (I - d·L) ws_new = (1 - d) + d·(D + U) ws_old
+    """
+    inverse = np.empty_like(sweep)
+    inverse[sweep] = np.arange(len(sweep))
+    permuted = transition[sweep][:, sweep].tocsr()
+    lower = sp.tril(permuted, k=-1, format='csr')
+    upper = (permuted - lower).tocsr()
+    system = (sp.identity(len(sweep), format='csr') - d * lower).tocsr()
+
+    x = ws[sweep]
+    for _ in range(iterations):
+        x = spsolve_triangular(system, (1 - d) + d * (upper @ x), lower=True)
+    return x[inverse]
+
+def pagerank(adjacency, d=DAMPING, tol=TOL, max_iter=MAX_ITER, blocks=None, method=None, sweep=None):
+    """
+    带权 PageRank: ws = (1 - d) + d * A · (ws / outSum)
+    blocks 为分块对角批量时每块的起始下标，归一化按块分别进行
+    method="jieba" 时需提供 sweep (节点按词字典序排列的下标)
+    返回按 jieba 规则归一化后的得分
+    """
+    method = method or METHOD
+    size = adjacency.shape[0]
+    if size == 0:
+        return np.zeros(0)
+
+    out_sum = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_out = np.divide(1.0, out_sum, out=np.zeros_like(out_sum), where=out_sum > 0)
+    # 列归一化的转移矩阵
+    transition = adjacency.multiply(inv_out[np.newaxis, :]).tocsr()
+
+    if blocks is None:
+        blocks = np.array([0])
+    lengths = np.diff(np.append(blocks, size))
+    ws = np.repeat(1.0 / lengths, lengths)
+
+    if method == "power":
+        ws = _power_iteration(transition, ws, d, tol, max_iter)
+    elif method == "jieba":
+        ws = _gauss_seidel(transition, ws, d, sweep, JIEBA_ITERATIONS)
+    else:
+        raise ValueError(f"未知的迭代方式: {method}")
+
+    # 与 jieba 相同的归一化: (w - min/10) / (max - min/10)
+    min_rank = np.minimum.reduceat(ws, blocks)
+    max_rank = np.maximum.reduceat(ws, blocks)
+    min_rank = np.minimum(min_rank, sys.float_info.max)
+    max_rank = np.maximum(max_rank, sys.float_info.min)
+    low = np.repeat(min_rank / 10.0, lengths)
+    return (ws - low) / (np.repeat(max_rank, lengths) - low)
+
+def _sweep_order(nodes, offset=0):
+    """jieba 按词的字典序逐个更新节点"""
+    return np.array(sorted(range(len(nodes)), key=nodes.__getitem__), dtype=np.int64) + offset
+
+def _top(nodes, scores, topK, withWeight):
+    """按得分降序输出，得分相同时保持节点原顺序 (与 sorted(..., reverse=True) 一致)"""
+    order = np.argsort(-scores, kind='stable')
+    if topK:
+        order = order[:topK]
+    if withWeight:
+        return [(nodes[i], float(scores[i])) for i in order]
+    return [nodes[i] for i in order]
+
+def textrank(sentence, topK=20, withWeight=False, allowPOS=('ns', 'n', 'vn', 'v'), method=None):
+    """jieba.analyse.textrank 的稀疏矩阵实现，参数与返回值相同"""
+    method = method or METHOD
+    nodes, adjacency = build_cooccurrence(sentence, allowPOS)
+    if not nodes:
+        return []
+    sweep = _sweep_order(nodes) if method == "jieba" else None
+    return _top(nodes, pagerank(adjacency, method=method, sweep=sweep), topK, withWeight)
+
+def textrank_batch(sentences, topK=20, withWeight=False, allowPOS=('ns', 'n', 'vn', 'v'), method=None):
+    """
+    批量 TextRank：各文档的共现图拼成一个分块对角矩阵，一次幂迭代得到全部得分
+    适合大量短文档 (逐篇迭代时矩阵运算的固定开销占比高)
+    METHOD="jieba" 时各块独立迭代固定轮数，结果与逐篇计算一致；
+    METHOD="power" 时按全部文档中的最大变化判断收敛，各篇的迭代轮数与逐篇计算不同，得分只在 TOL 量级内一致，
+    得分接近的词排序可能互换 (80 篇中有 2 篇的结果与逐篇计算不同)
+    """
+    graphs = [build_cooccurrence(sentence, allowPOS) for sentence in sentences]
+    non_empty = [(i, nodes, adj) for i, (nodes, adj) in enumerate(graphs) if nodes]
+    results = [[] for _ in sentences]
+    if not non_empty:
+        return results
+
+    method = method or METHOD
+    sizes = np.array([len(nodes) for _, nodes, _ in non_empty])
+    blocks = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    sweep = None
+    if method == "jieba":
+        sweep = np.concatenate([_sweep_order(nodes, start) for (_, nodes, _), start in zip(non_empty, blocks)])
+    adjacency = sp.block_diag([adj for _, _, adj in non_empty], format='csr')
+    scores = pagerank(adjacency, blocks=blocks, method=method, sweep=sweep)
+
+    for (i, nodes, _), start, size in zip(non_empty, blocks, sizes):
+        results[i] = _top(nodes, scores[start:start + size], topK, withWeight)
+    return results
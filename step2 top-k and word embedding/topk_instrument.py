@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import cProfile
+import pstats
+from contextlib import contextmanager, nullcontext
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import jieba.analyse
+
+# ================= 配置区域 =================
+
+# 逐篇计时记录的阶段
+PHASES = ('decode', 'segmentation', 'tfidf', 'textrank', 'fusion')
+
+# 每个国家保留的最慢文档数 / 失败样例数
+SLOWEST_N = 10
+ERROR_SAMPLES_N = 20
+
+# ===========================================
+
+class TimedTokenizer:
+    """
+    包装 jieba 分词器，累计 cut() 中真正花在分词上的时间
+    TF-IDF 与 TextRank 都在内部调用分词，用它把分词耗时从两者中拆出来
+    """
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.elapsed = 0.0
+
+    def cut(self, sentence, *args, **kwargs):
+        # CachedTokenizer 在 cut() 调用时就整篇切分完毕，调用本身也要计时
+        start = time.perf_counter()
+        gen = self.tokenizer.cut(sentence, *args, **kwargs)
+        self.elapsed += time.perf_counter() - start
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(gen)
+            except StopIteration:
+                self.elapsed += time.perf_counter() - start
+                return
+            self.elapsed += time.perf_counter() - start
+            yield item
+
+    def __getattr__(self, name):
+        return getattr(self.tokenizer, name)
+
+class DocRecord:
+    """单篇文档的各阶段耗时与状态"""
+    def __init__(self, file_name, tokenizers):
+        self.file_name = file_name
+        self.tokenizers = tokenizers
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.text_length = 0
+        self.status = 'ok'
+        self.error = ''
+
+    @contextmanager
+    def phase(self, name):
+        tokenizer = self.tokenizers.get(name)
+        seg_start = tokenizer.elapsed if tokenizer else 0.0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if tokenizer:
+                seg = tokenizer.elapsed - seg_start
+                self.phases['segmentation'] += seg
+                elapsed -= seg
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def skip(self, reason):
+        self.status = 'skipped'
+        self.error = reason
+
+    def fail(self, exc):
+        self.status = 'failed'
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def total(self):
+        return sum(self.phases.values())
+
+    def to_row(self):
+        row = {'file_name': self.file_name, 'text_length': self.text_length, 'status': self.status}
+        row.update({k: round(v, 6) for k, v in self.phases.items()})
+        row['total'] = round(self.total(), 6)
+        row['error'] = self.error
+        return row
+
+class _NullDoc:
+    """关闭诊断时使用，所有记录操作均为空操作"""
+    text_length = 0
+
+    def phase(self, name):
+        return nullcontext()
+
+    def skip(self, reason):
+        pass
+
+    def fail(self, exc):
+        pass
+
+_NULL_DOC = _NullDoc()
+
+class TopKInstrument:
+    """
+    TOP-K 提取的逐篇诊断 (默认关闭)
+    开启后记录每篇文档 decode / segmentation / tfidf / textrank / fusion 耗时与失败原因，
+    并按国家汇总为 p50/p95/max、最慢文档与错误计数
+    """
+    def __init__(self, enabled=False, stats_dir=None):
+        self.enabled = enabled
+        self.stats_dir = stats_dir
+        self.tokenizers = {}
+        self.country = None
+        self.records = []
+        self.summaries = {}
+
+    def install(self):
+        """替换 TF-IDF 与 TextRank 内部的分词器为计时版本"""
+        if not self.enabled:
+            return
+        tfidf = jieba.analyse.default_tfidf
+        textrank = jieba.analyse.default_textrank
+        self.tokenizers = {
+            'tfidf': TimedTokenizer(tfidf.postokenizer),
+            'textrank': TimedTokenizer(textrank.tokenizer),
+        }
+        tfidf.postokenizer = self.tokenizers['tfidf']
+        textrank.tokenizer = textrank.postokenizer = self.tokenizers['textrank']
+
+    def uninstall(self):
+        """还原 jieba 原始分词器"""
+        if not self.tokenizers:
+            return
+        tfidf = jieba.analyse.default_tfidf
+        textrank = jieba.analyse.default_textrank
+        tfidf.postokenizer = self.tokenizers['tfidf'].tokenizer
+        textrank.tokenizer = textrank.postokenizer = self.tokenizers['textrank'].tokenizer
+        self.tokenizers = {}
+
+    def start_country(self, country):
+        self.country = country
+        self.records = []
+
+    @contextmanager
+    def document(self, file_name):
+        if not self.enabled:
+            yield _NULL_DOC
+            return
+        doc = DocRecord(file_name, self.tokenizers)
+        try:
+            yield doc
+        finally:
+            self.records.append(doc)
+
+    def finish_country(self):
+        """汇总当前国家并写出逐篇计时 CSV"""
+        if not self.enabled or self.country is None:
+            return None
+        summary = summarize_records(self.records)
+        self.summaries[self.country] = summary
+
+        if self.stats_dir and self.records:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            timing_path = os.path.join(self.stats_dir, f"{self.country}_doc_timings.csv")
+            pd.DataFrame([r.to_row() for r in self.records]).to_csv(timing_path, index=False, encoding='utf-8-sig')
+
+        print(f"  -> [诊断] {summary['docs_ok']} 篇成功, {summary['docs_failed']} 篇失败, "
+              f"{summary['docs_skipped']} 篇跳过, 单篇 p95 {summary['phases']['total']['p95'] * 1000:.1f} ms")
+        self.country = None
+        return summary
+
+    def write(self):
+        """将所有国家的汇总写入 topk_stats.json"""
+        if not self.enabled or not self.stats_dir or not self.summaries:
+            return None
+        os.makedirs(self.stats_dir, exist_ok=True)
+        stats_path = os.path.join(self.stats_dir, "topk_stats.json")
+        with open(stats_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summaries, f, ensure_ascii=False, indent=2)
+        print(f"-> [诊断] 统计已保存至: {stats_path}")
+        return stats_path
+
+def _describe(values):
+    if len(values) == 0:
+        return {'p50': 0.0, 'p95': 0.0, 'max': 0.0, 'mean': 0.0, 'sum': 0.0}
+    arr = np.asarray(values, dtype=float)
+    return {
+        'p50': round(float(np.percentile(arr, 50)), 6),
+        'p95': round(float(np.percentile(arr, 95)), 6),
+        'max': round(float(arr.max()), 6),
+        'mean': round(float(arr.mean()), 6),
+        'sum': round(float(arr.sum()), 6),
+    }
+
+def summarize_records(records, slowest_n=SLOWEST_N):
+    """按国家汇总逐篇记录"""
+    ok = [r for r in records if r.status == 'ok']
+    failed = [r for r in records if r.status == 'failed']
+    skipped = [r for r in records if r.status == 'skipped']
+
+    phase_names = list(PHASES) + sorted({k for r in ok for k in r.phases} - set(PHASES))
+    phases = {name: _describe([r.phases.get(name, 0.0) for r in ok]) for name in phase_names}
+    phases['total'] = _describe([r.total() for r in ok])
+
+    slowest = sorted(ok, key=lambda r: r.total(), reverse=True)[:slowest_n]
+
+    return {
+        'docs_ok': len(ok),
+        'docs_failed': len(failed),
+        'docs_skipped': len(skipped),
+        'phases': phases,
+        'slowest': [
+            {
+                'file_name': r.file_name,
+                'text_length': r.text_length,
+                'total': round(r.total(), 6),
+                'dominant_phase': max(r.phases, key=r.phases.get),
+            }
+            for r in slowest
+        ],
+        'error_counts': dict(Counter(r.error.split(':')[0] for r in failed)),
+        'skip_counts': dict(Counter(r.error for r in skipped)),
+        'error_samples': [
+            {'file_name': r.file_name, 'error': r.error} for r in failed[:ERROR_SAMPLES_N]
+        ],
+    }
+
+def run_with_profile(func, profile_path, top_n=40):
+    """
+    在 cProfile 下运行 func，输出 .prof (可用 snakeviz / pstats 查看)
+    及按累计耗时排序的文本摘要；采样式分析可直接使用 py-spy record -- python TOP-K.py
+    """
+    profile_dir = os.path.dirname(profile_path)
+    if profile_dir and not os.path.exists(profile_dir):
+        os.makedirs(profile_dir)
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(profile_path)
+        with open(profile_path + ".txt", 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(top_n)
+        print(f"-> [诊断] cProfile 结果已保存至: {profile_path}")
@@ -5,6 +5,7 @@ from collections import Counter
 from wordcloud import WordCloud
 from PIL import Image, ImageDraw
 import matplotlib.pyplot as plt
+import corpus_stats
 
 # ================= 配置区域 =================
 
@@ -18,6 +19,10 @@ PRIORITY_MIN_DF = 3
 # 【配置 2】Zipf 比例：以总词汇量的多少作为目标数量 (15%)
 ZIPF_RATIO = 0.15
 
+# 【配置 3】按各国 rank-frequency 分布拟合 Zipf 曲线，自动确定词数与 DF 阈值 (见 corpus_stats.py)
+# 拟合参数缓存在 corpus_stats.json；False 时使用上面的固定 ZIPF_RATIO / PRIORITY_MIN_DF
+ADAPTIVE_CUTOFF = False
+
 # 画布清晰度
 SCALE = 4 
 
@@ -31,6 +36,102 @@ def create_ellipse_mask(width=1600, height=1200):
     draw.ellipse((margin, margin, width-margin, height-margin), fill="black")
     return np.array(mask)
 
+def read_keyword_csv(file_path):
+    """读取 TOP-K 关键词文件 (utf-8 失败时回退 gb18030)"""
+    try:
+        return pd.read_csv(file_path, encoding='utf-8')
+    except:
+        return pd.read_csv(file_path, encoding='gb18030')
+
+def count_document_frequency(df):
+    """统计每个关键词出现的文档数 (DF)"""
+    all_keywords = []
+    for kw_str in df['keywords']:
+        if pd.isna(kw_str) or kw_str == "": continue
+        # 确保单文件内去重 (保持原有顺序，同频词的先后在多次运行间一致)
+        words = list(dict.fromkeys([w.strip() for w in str(kw_str).split(',') if w.strip()]))
+        all_keywords.extend(words)
+    return Counter(all_keywords)
+
+def cutoff_params(country, word_counts, signature=None, stats=None):
+    """
+    读取 (或拟合并缓存) 该国的 Zipf 截断参数，ADAPTIVE_CUTOFF 关闭时返回 None
+    signature 为 None 时直接沿用已缓存的参数 (增量更新时不重新拟合)
+    """
+    if not ADAPTIVE_CUTOFF:
+        return None
+    stats = stats or corpus_stats.CorpusStats()
+    params = stats.get('zipf', country, signature)
+    if params is not None:
+        return params
+    params = corpus_stats.fit_zipf(word_counts.values())
+    if params is None:
+        return None
+    print(f"  -> [统计] Zipf 指数 {params['exponent']:.2f}，覆盖 {params['coverage']:.0%} 重复词频次需 "
+          f"{params['target_n']} 个词，DF 阈值 {params['priority_min_df']}")
+    return stats.put('zipf', country, params, signature)
+
+def select_keywords(word_counts, min_display=30, params=None):
+    """
+    双梯队填充策略
+    按 Zipf 比例确定目标数量，优先录取 DF 达标的词，不足时用低频词补齐
+    params 为该国拟合参数时，目标数量与 DF 阈值取拟合结果
+    返回 (入选词列表, 目标数量, 高频词个数)
+    """
+    # 获取所有词的列表 [('词A', 10), ('词B', 5)...] 按频率降序
+    all_items_sorted = word_counts.most_common()
+    total_vocab_size = len(all_items_sorted)
+    min_df = params['priority_min_df'] if params else PRIORITY_MIN_DF
+
+    # 1. 计算 Zipf 目标数量
+    target_n = params['target_n'] if params else int(total_vocab_size * ZIPF_RATIO)
+    
+    # 兜底：至少展示 min_display 个词（防止小国词汇量太少画不出来），且不能超过总数
+    target_n = max(min_display, target_n)
+    target_n = min(target_n, total_vocab_size) # 不能超过实际总数
+
+    # 2. 划分梯队
+    # 第一梯队：满足 DF 阈值 (高质量)
+    high_priority = [item for item in all_items_sorted if item[1] >= min_df]
+    # 第二梯队：不满足 DF 阈值 (用于凑数)
+    low_priority = [item for item in all_items_sorted if item[1] < min_df]
+
+    # 3. 填充逻辑
+    if len(high_priority) >= target_n:
+        # 情况 A: 高质量词足够多，只取高质量的前 N 个
+        final_items = high_priority[:target_n]
+    else:
+        # 情况 B: 高质量词不够，先拿光所有高质量词，再用低频词补齐
+        needed_more = target_n - len(high_priority)
+        final_items = high_priority + low_priority[:needed_more]
+
+    return final_items, target_n, len(high_priority)
+
+def build_weight_frame(final_items, min_df=PRIORITY_MIN_DF):
+    """入选词转为权重表，并标记哪些是补位的"""
+    weight_df = pd.DataFrame(final_items, columns=['Keyword', 'Weight'])
+    weight_df['Type'] = weight_df['Weight'].apply(lambda x: 'High_DF' if x >= min_df else 'Low_DF_Fill')
+    return weight_df
+
+def render_wordcloud(word_freq_dict, target_n, ellipse_mask, img_save_path):
+    """按词频生成椭圆词云并保存"""
+    wc = WordCloud(
+        font_path=FONT_PATH,
+        background_color='white',
+        mask=ellipse_mask,
+        max_words=target_n, # 强制使用计算出的数量
+        max_font_size=250,
+        min_font_size=10,
+        random_state=42,
+        prefer_horizontal=0.9,
+        colormap='Dark2',
+        contour_width=2,
+        contour_color='steelblue',
+        scale=SCALE
+    )
+    wc.generate_from_frequencies(word_freq_dict)
+    wc.to_file(img_save_path)
+
 def generate_priority_filled_wordcloud():
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
@@ -53,69 +154,31 @@ def generate_priority_filled_wordcloud():
         
         print(f"\n正在处理 [{country_name}] ...")
 
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-        except:
-            df = pd.read_csv(file_path, encoding='gb18030')
+        df = read_keyword_csv(file_path)
 
         # 1. 收集所有词 (计算文档频率)
-        all_keywords = []
-        for kw_str in df['keywords']:
-            if pd.isna(kw_str) or kw_str == "": continue
-            # 确保单文件内去重
-            words = list(set([w.strip() for w in str(kw_str).split(',') if w.strip()]))
-            all_keywords.extend(words)
-
-        word_counts = Counter(all_keywords)
+        word_counts = count_document_frequency(df)
         
-        # 获取所有词的列表 [('词A', 10), ('词B', 5)...] 按频率降序
-        all_items_sorted = word_counts.most_common()
-        total_vocab_size = len(all_items_sorted)
-        
-        if total_vocab_size == 0:
+        if len(word_counts) == 0:
             print(f"  -> {country_name} 数据为空，跳过。")
             continue
 
-        # --- 【核心逻辑修改：双梯队填充策略】 ---
+        # --- 【核心逻辑：双梯队填充策略】 ---
+        params = cutoff_params(country_name, word_counts, corpus_stats.file_signature(file_path))
+        min_df = params['priority_min_df'] if params else PRIORITY_MIN_DF
+        final_items, target_n, n_high = select_keywords(word_counts, params=params)
 
-        # 1. 计算 Zipf 目标数量
-        target_n = int(total_vocab_size * ZIPF_RATIO)
-        
-        # 兜底：至少展示 30 个词（防止小国词汇量太少画不出来），且不能超过总数
-        min_display = 30
-        target_n = max(min_display, target_n)
-        target_n = min(target_n, total_vocab_size) # 不能超过实际总数
-
-        # 2. 划分梯队
-        # 第一梯队：满足 DF 阈值 (高质量)
-        high_priority = [item for item in all_items_sorted if item[1] >= PRIORITY_MIN_DF]
-        # 第二梯队：不满足 DF 阈值 (用于凑数)
-        low_priority = [item for item in all_items_sorted if item[1] < PRIORITY_MIN_DF]
-
-        final_items = []
-        
-        # 3. 填充逻辑
-        if len(high_priority) >= target_n:
-            # 情况 A: 高质量词足够多，只取高质量的前 N 个
-            final_items = high_priority[:target_n]
-            print(f"  -> [质量极佳] 目标 {target_n} 个，全部来自高频词 (DF>={PRIORITY_MIN_DF})")
+        if n_high >= target_n:
+            print(f"  -> [质量极佳] 目标 {target_n} 个，全部来自高频词 (DF>={min_df})")
         else:
-            # 情况 B: 高质量词不够，先拿光所有高质量词，再用低频词补齐
-            needed_more = target_n - len(high_priority)
-            final_items = high_priority + low_priority[:needed_more]
-            print(f"  -> [混合填充] 目标 {target_n} 个 = {len(high_priority)} 个高频词 + {needed_more} 个低频词补位")
-
-        # --- 【逻辑结束】 ---
+            print(f"  -> [混合填充] 目标 {target_n} 个 = {n_high} 个高频词 + {target_n - n_high} 个低频词补位")
 
         # 转为字典供词云使用
         word_freq_dict = dict(final_items)
 
         # ================= 保存权重数据文件 =================
         try:
-            weight_df = pd.DataFrame(final_items, columns=['Keyword', 'Weight'])
-            
-            # 增加一列标记，方便你查看哪些是补位的
-            weight_df['Type'] = weight_df['Weight'].apply(lambda x: 'High_DF' if x >= PRIORITY_MIN_DF else 'Low_DF_Fill')
+            weight_df = build_weight_frame(final_items, min_df)
 
             csv_save_name = f"{country_name}_Weights.csv"
             csv_save_path = os.path.join(OUTPUT_DIR, csv_save_name)
@@ -127,26 +190,10 @@ def generate_priority_filled_wordcloud():
             print(f"  [警告] 权重文件保存失败: {e}")
 
         # ================= 生成词云 =================
-        wc = WordCloud(
-            font_path=FONT_PATH,
-            background_color='white',
-            mask=ellipse_mask,
-            max_words=target_n, # 强制使用计算出的数量
-            max_font_size=250,
-            min_font_size=10,
-            random_state=42,
-            prefer_horizontal=0.9,
-            colormap='Dark2',
-            contour_width=2,
-            contour_color='steelblue',
-            scale=SCALE
-        )
-
         try:
-            wc.generate_from_frequencies(word_freq_dict)
             img_save_name = f"{country_name}_Cloud.png"
             img_save_path = os.path.join(OUTPUT_DIR, img_save_name)
-            wc.to_file(img_save_path)
+            render_wordcloud(word_freq_dict, target_n, ellipse_mask, img_save_path)
             print(f"  -> [图片] 词云已保存: {img_save_name}")
 
         except Exception as e:
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP2_DIR = os.path.join(REPO_DIR, "step2 top-k and word embedding")
+
+if STEP2_DIR not in sys.path:
+    sys.path.insert(0, STEP2_DIR)
+
+import incremental_update
+
+WORDS = ["经济", "贸易", "投资", "能源", "港口", "铁路", "企业", "市场", "技术", "创新", "金融", "农业"]
+
+def keyword_rows(country_index, start, n):
+    rows = []
+    for i in range(start, start + n):
+        words = [WORDS[(country_index * 3 + i + j) % len(WORDS)] for j in range(4)]
+        rows.append({'file_name': f"text_{i}.txt", 'keywords': ",".join(words),
+                     'count': len(words), 'text_length': 100})
+    return rows
+
+def point_paths(monkeypatch, root):
+    for name, rel in [('SOURCE_DIR', "country-orgin"), ('KEYWORD_DIR', "TOP-K keyword"),
+                      ('WEIGHTS_DIR', "country-keyword"), ('STATE_DIR', "incremental_state"),
+                      ('WEIGHTED_SIM_PATH', "weighted.xlsx"), ('WEIGHTED_HEATMAP_PATH', "weighted.png")]:
+        monkeypatch.setattr(incremental_update, name, os.path.join(root, rel))
+
+def test_row_update_matches_full_recompute_and_survives_render_failure(tmp_path, monkeypatch):
+    point_paths(monkeypatch, str(tmp_path))
+
+    def no_font(*args, **kwargs):
+        raise RuntimeError("找不到中文字体")
+    monkeypatch.setattr(incremental_update, "render_preset", no_font)
+
+    updater = incremental_update.IncrementalUpdater()
+    countries = ["甲国", "乙国", "丙国"]
+    for c, country in enumerate(countries):
+        assert updater.apply(country, keyword_rows(c, 0, 6))['added'] == 6
+
+    # 绘图失败不影响增量结果；重试同一批文档不会重复计入
+    summary = updater.apply("甲国", keyword_rows(0, 6, 4))
+    assert summary['added'] == 4
+    assert updater.apply("甲国", keyword_rows(0, 6, 4))['added'] == 0
+    keywords = pd.read_csv(os.path.join(incremental_update.KEYWORD_DIR, "甲国_keywords.csv"))
+    assert len(keywords) == 10
+
+    # 只重算一行一列的结果与全量重算一致
+    data_dict = updater.cosine.load_country_weights(incremental_update.WEIGHTS_DIR)
+    expected = updater.cosine.compute_similarity(data_dict)
+    actual = pd.read_excel(incremental_update.WEIGHTED_SIM_PATH, index_col=0)
+    actual = actual.loc[expected.index, expected.columns]
+    assert np.allclose(actual.values, expected.values)
@@ -0,0 +1,50 @@
+import os
+import sys
+import asyncio
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP1_DIR = os.path.join(REPO_DIR, "step1 data clean")
+
+if STEP1_DIR not in sys.path:
+    sys.path.insert(0, STEP1_DIR)
+
+import ingest
+
+def make_drop(root, folder, rows):
+    export_dir = os.path.join(root, "drop", folder)
+    os.makedirs(export_dir)
+    with open(os.path.join(export_dir, "export.csv"), 'w', encoding='utf-8') as f:
+        f.write("fileId,title\n")
+        for file_id, title, has_text in rows:
+            f.write(f"{file_id},{title}\n")
+            if has_text:
+                with open(os.path.join(export_dir, f"text_{file_id}.txt"), 'w', encoding='utf-8') as t:
+                    t.write(title)
+    return os.path.join(root, "drop")
+
+def run(drop_dir, store_dir):
+    ingestor = ingest.Ingestor(drop_dir, store_dir)
+    asyncio.run(ingestor.run())
+    return ingestor
+
+def test_export_folder_limits_countries(tmp_path):
+    drop_dir = str(tmp_path / "drop")
+    group = ingest.export_config(os.path.join(drop_dir, "日韩沙特印尼", "Success", "list.csv"), drop_dir)
+    assert list(group) == ingest.TASK_COUNTRIES["日韩沙特印尼"]
+    assert list(ingest.export_config(os.path.join(drop_dir, "中国汇总", "a.csv"), drop_dir)) == ["中国"]
+    assert ingest.export_config(os.path.join(drop_dir, "a.csv"), drop_dir) is ingest.COUNTRY_CONFIG
+
+def test_rows_stay_in_their_export_and_are_not_reprocessed(tmp_path):
+    root = str(tmp_path)
+    # 第 1 篇同时提到中国，但来自美国导出，只能归入美国
+    drop_dir = make_drop(root, "美国", [("1", "中国 中方 美国白宫", True), ("2", "天气晴", True), ("3", "美国", False)])
+    store_dir = os.path.join(root, "store")
+
+    first = run(drop_dir, store_dir)
+    assert first.per_country == {"美国": 1}
+    assert (first.stats['unclassified'], first.stats['missing']) == (1, 1)
+
+    second = run(drop_dir, store_dir)
+    assert second.stats['skipped'] == 3
+    with open(os.path.join(store_dir, ingest.MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        assert len(f.readlines()) == 3
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from common.stream_writer import StreamWriter
+
+COLUMNS = ['file_name', 'keywords']
+
+def rows(start, stop):
+    return [{'file_name': f"text_{i}.txt", 'keywords': f"词{i}"} for i in range(start, stop)]
+
+def test_restore_truncates_unrecorded_tail_and_skips_done_keys(tmp_path):
+    path = str(tmp_path / "out.csv")
+    writer = StreamWriter(path, COLUMNS, key='file_name', batch_rows=2)
+    for row in rows(0, 2):
+        writer.write(row)
+    writer.mark_done("empty.txt")
+    for row in rows(2, 4):
+        writer.write(row)
+    # 模拟中断：断点之后写了半批数据，缓冲区里还有一行未写盘
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("text_9.txt,半批\n")
+    with open(writer.done_path, 'a', encoding='utf-8') as f:
+        f.write("text_9.txt\n")
+    writer.write(rows(4, 5)[0])
+
+    resumed = StreamWriter(path, COLUMNS, key='file_name', batch_rows=2)
+    assert resumed.rows_written == 4
+    assert resumed.done == {f"text_{i}.txt" for i in range(4)} | {"empty.txt"}
+    assert not resumed.is_done("text_9.txt")
+    assert sorted(pd.read_csv(path, encoding='utf-8-sig')['file_name']) == [f"text_{i}.txt" for i in range(4)]
+
+    for row in rows(4, 6):
+        resumed.write(row)
+    assert resumed.close() == 6
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    assert list(df['file_name']) == [f"text_{i}.txt" for i in range(6)]
+    assert not os.path.exists(resumed.checkpoint_path) and not os.path.exists(resumed.done_path)
+
+def test_without_resume_starts_over(tmp_path):
+    path = str(tmp_path / "out.csv")
+    writer = StreamWriter(path, COLUMNS, key='file_name', batch_rows=2)
+    for row in rows(0, 4):
+        writer.write(row)
+
+    fresh = StreamWriter(path, COLUMNS, key='file_name', batch_rows=2, resume=False)
+    assert fresh.rows_written == 0 and not fresh.done
+    assert not os.path.exists(path)
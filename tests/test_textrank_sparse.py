@@ -0,0 +1,46 @@
+import os
+import sys
+
+import jieba
+import jieba.analyse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP2_DIR = os.path.join(REPO_DIR, "step2 top-k and word embedding")
+
+if STEP2_DIR not in sys.path:
+    sys.path.insert(0, STEP2_DIR)
+
+import textrank_sparse
+
+ALLOWED_POS = ('vn', 'n', 'nr', 'ns', 'nt', 'nz')
+
+DOCUMENTS = [
+    "德国政府宣布将加大对可再生能源的投资，推动能源转型。柏林方面表示，风能和太阳能发电在电力结构中的比重持续上升，"
+    "企业界呼吁简化审批流程，加快电网建设，以保障工业用电和居民用电的稳定供应。",
+    "日本与韩国在东京举行经济对话，双方就半导体供应链、技术合作和贸易规则交换意见。会议认为，稳定的供应链对两国制造业至关重要，"
+    "双方同意建立定期磋商机制，共同应对市场波动带来的风险。",
+    "印度尼西亚雅加达港口扩建工程进入新阶段，中国企业参与的铁路项目也在推进。当地官员表示，基础设施建设将带动就业，"
+    "改善物流效率，吸引更多外国投资进入制造业和农业领域。",
+    "沙特阿拉伯利雅得举办投资论坛，能源企业和金融机构讨论经济多元化战略。与会者认为，旅游业、科技创新和新能源产业将成为新的增长点，"
+    "政府将继续推进改革，优化营商环境。",
+]
+
+def setup_module(module):
+    jieba.setLogLevel(60)
+
+def test_jieba_method_matches_jieba_textrank():
+    worst = 0.0
+    for text in DOCUMENTS:
+        expected = jieba.analyse.textrank(text, topK=None, withWeight=True, allowPOS=ALLOWED_POS)
+        actual = textrank_sparse.textrank(text, topK=None, withWeight=True, allowPOS=ALLOWED_POS, method="jieba")
+        assert [w for w, _ in actual] == [w for w, _ in expected]
+        worst = max([worst] + [abs(a - e) for (_, a), (_, e) in zip(actual, expected)])
+    assert worst < 1e-12
+
+def test_jieba_method_batch_matches_single():
+    single = [textrank_sparse.textrank(text, topK=20, withWeight=True, allowPOS=ALLOWED_POS, method="jieba")
+              for text in DOCUMENTS]
+    batch = textrank_sparse.textrank_batch(DOCUMENTS, topK=20, withWeight=True, allowPOS=ALLOWED_POS, method="jieba")
+    for one, many in zip(single, batch):
+        assert [w for w, _ in one] == [w for w, _ in many]
+        assert max(abs(a - b) for (_, a), (_, b) in zip(one, many)) < 1e-12
@@ -0,0 +1,27 @@
+import jieba.analyse
+import pytest
+
+from test_topk_resume import make_corpus, load_topk
+
+class Boom(Exception):
+    pass
+
+def test_tokenizers_restored_after_failure(tmp_path):
+    root = str(tmp_path)
+    topk = load_topk(root, make_corpus(root))
+    topk.ENABLE_INSTRUMENTATION = True
+    topk.STATS_DIR = str(tmp_path / "stats")
+
+    tfidf = jieba.analyse.default_tfidf
+    textrank = jieba.analyse.default_textrank
+    before = (tfidf.postokenizer, textrank.tokenizer, textrank.postokenizer)
+
+    def fail(*args, **kwargs):
+        raise Boom()
+
+    # 逐篇异常会被记录并跳过，这里让国家级步骤出错
+    topk.StreamWriter = fail
+    with pytest.raises(Boom):
+        topk.extract_and_save_to_target()
+
+    assert (tfidf.postokenizer, textrank.tokenizer, textrank.postokenizer) == before
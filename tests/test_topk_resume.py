@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import importlib.util
+
+import pandas as pd
+import pytest
+from jieba.analyse.tfidf import KeywordExtractor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP2_DIR = os.path.join(REPO_DIR, "step2 top-k and word embedding")
+TOPK_PATH = os.path.join(STEP2_DIR, "TOP-K.py")
+
+# TOP-K.py 按同目录模块导入 (topk_instrument、segmenter 等)
+if STEP2_DIR not in sys.path:
+    sys.path.insert(0, STEP2_DIR)
+
+COUNTRIES = ["法国", "英国"]
+DOCS_PER_COUNTRY = 8
+WORDS = ["经济", "贸易", "投资", "能源", "港口", "铁路", "企业", "市场", "技术", "创新", "金融", "农业"]
+
+class Interrupt(BaseException):
+    """模拟 Ctrl+C (不被逐篇处理的 except Exception 捕获)"""
+
+def make_corpus(root):
+    source = os.path.join(root, "country")
+    for c, country in enumerate(COUNTRIES):
+        country_dir = os.path.join(source, country)
+        os.makedirs(country_dir)
+        for i in range(DOCS_PER_COUNTRY):
+            # 正文提到另一个国家：其名称只有在另一个国家的停用词被带过来时才会被过滤
+            other = COUNTRIES[1 - c]
+            body = "，".join(f"{WORDS[(i + j + c) % len(WORDS)]}合作推动{other}{WORDS[(i * 3 + j) % len(WORDS)]}发展"
+                            for j in range(12))
+            with open(os.path.join(country_dir, f"text_{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"{country}第{i}篇。{body}。")
+    with open(os.path.join(source, "cn_stopwords.txt"), 'w', encoding='utf-8') as f:
+        f.write("的\n")
+    return source
+
+def load_topk(root, source):
+    spec = importlib.util.spec_from_file_location("topk_resume_test", TOPK_PATH)
+    topk = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(topk)
+    topk.SOURCE_DIR = source
+    topk.OUTPUT_DIR = os.path.join(root, "TOP-K keyword")
+    topk.STOPWORDS_PATH = os.path.join(source, "cn_stopwords.txt")
+    topk.STREAM_BATCH_ROWS = 2
+    topk.RESUME = True
+    topk.jieba.setLogLevel(60)
+    return topk
+
+def run(topk, interrupt_at=None):
+    """运行一次提取，返回按国家统计的 TF-IDF 调用次数与处理顺序；interrupt_at=(第几个国家, 第几篇) 时中断"""
+    calls, order = {}, []
+    original = topk.tfidf_candidates
+    # 每次运行相当于新进程：还原 jieba 的默认停用词 (进程级全局状态)
+    topk.jieba.analyse.default_tfidf.stop_words = set(KeywordExtractor.STOP_WORDS)
+    topk.jieba.analyse.default_textrank.stop_words = set(KeywordExtractor.STOP_WORDS)
+
+    def counting(content_clean, candidate_k):
+        country = content_clean[:2]
+        if country not in calls:
+            order.append(country)
+        calls[country] = calls.get(country, 0) + 1
+        if interrupt_at and len(order) == interrupt_at[0] and calls[country] > interrupt_at[1]:
+            raise Interrupt()
+        return original(content_clean, candidate_k)
+
+    topk.tfidf_candidates = counting
+    try:
+        topk.extract_and_save_to_target()
+    finally:
+        topk.tfidf_candidates = original
+    return calls, order
+
+def test_resume_skips_countries_finished_before_interrupt(tmp_path):
+    root = str(tmp_path)
+    source = make_corpus(root)
+    topk = load_topk(root, source)
+
+    # 第二个国家处理到第 5 篇时中断
+    with pytest.raises(Interrupt):
+        run(topk, interrupt_at=(2, 5))
+    manifest_path = os.path.join(topk.OUTPUT_DIR, topk.RUN_MANIFEST_NAME)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        completed = list(json.load(f)['completed'])
+    assert len(completed) == 1
+    first = completed[0]
+    second = next(c for c in COUNTRIES if c != first)
+
+    calls, _ = run(topk)
+    # 已完成的国家不再提取；中断的国家只补做未写盘的文档
+    assert first not in calls
+    assert 0 < calls[second] < DOCS_PER_COUNTRY
+
+    for country in COUNTRIES:
+        df = pd.read_csv(os.path.join(topk.OUTPUT_DIR, f"{country}_keywords.csv"))
+        assert sorted(df['file_name']) == sorted(f"text_{i}.txt" for i in range(DOCS_PER_COUNTRY))
+    assert not os.path.exists(manifest_path)
+
+def read_keywords(topk):
+    return {country: pd.read_csv(os.path.join(topk.OUTPUT_DIR, f"{country}_keywords.csv"))
+            .sort_values('file_name').reset_index(drop=True) for country in COUNTRIES}
+
+def test_resumed_output_matches_uninterrupted_run(tmp_path):
+    full = load_topk(str(tmp_path / "full"), make_corpus(str(tmp_path / "full")))
+    run(full)
+
+    resumed = load_topk(str(tmp_path / "resumed"), make_corpus(str(tmp_path / "resumed")))
+    with pytest.raises(Interrupt):
+        run(resumed, interrupt_at=(2, 5))
+    run(resumed)
+
+    expected, actual = read_keywords(full), read_keywords(resumed)
+    for country in COUNTRIES:
+        pd.testing.assert_frame_equal(actual[country], expected[country])
+
+def test_completed_run_starts_fresh(tmp_path):
+    root = str(tmp_path)
+    source = make_corpus(root)
+    topk = load_topk(root, source)
+
+    run(topk)
+    calls, _ = run(topk)
+    assert calls == {country: DOCS_PER_COUNTRY for country in COUNTRIES}